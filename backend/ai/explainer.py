@@ -1,5 +1,16 @@
 import re
 
+import numpy as np
+
+RECOMMENDATIONS = {
+    "Healthy": "System functioning normally. Continue routine monitoring.",
+    "Warning": "Early signs of degradation detected. Schedule preventive inspection.",
+    "Critical": "Critical condition detected. Immediate maintenance recommended.",
+}
+
+# compiled once instead of per call; other names still work through re
+PATTERNS = {name: re.compile(rf"{name}:(\d+)") for name in ("health", "anomalies", "noise")}
+
 
 def compute_status(health):
 
@@ -47,7 +58,9 @@ def compute_confidence(health, anomalies, noise):
 
 def extract_value(prompt, name):
 
-    match = re.search(rf"{name}:(\d+)", prompt)
+    pattern = PATTERNS.get(name) or re.compile(rf"{name}:(\d+)")
+
+    match = pattern.search(prompt)
 
     if match:
         return int(match.group(1))
@@ -55,19 +68,10 @@ def extract_value(prompt, name):
     return 0
 
 
-def generate_explanation(prompt):
-
-    health = extract_value(prompt, "health")
-    anomalies = extract_value(prompt, "anomalies")
-    noise = extract_value(prompt, "noise")
+def render(health, status, confidence, anomalies, noise, risk):
 
-    status = compute_status(health)
-
-    risk = analyze_risk(anomalies, noise)
-
-    confidence = compute_confidence(health, anomalies, noise)
-
-    explanation = f"""
+    # an f-string is markedly cheaper than str.format per explanation
+    return f"""
 System Health: {health}%
 Status: {status}
 Confidence Score: {confidence}%
@@ -82,18 +86,66 @@ Risk Assessment:
 {risk}
 
 Recommendation:
-"""
+{RECOMMENDATIONS[status]}"""
 
-    if status == "Healthy":
 
-        explanation += "System functioning normally. Continue routine monitoring."
+def explain(health, anomalies, noise):
 
-    elif status == "Warning":
+    return render(
+        health,
+        compute_status(health),
+        compute_confidence(health, anomalies, noise),
+        anomalies,
+        noise,
+        analyze_risk(anomalies, noise)
+    )
 
-        explanation += "Early signs of degradation detected. Schedule preventive inspection."
 
-    else:
+# every (anomaly level, noise level) risk text, indexed by the thresholds
+# analyze_risk uses
+RISK_TABLE = [[analyze_risk(a, n) for n in (0, 10, 20)] for a in (0, 3, 10)]
+
+STATUSES = np.array(["Critical", "Warning", "Healthy"], dtype=object)
 
-        explanation += "Critical condition detected. Immediate maintenance recommended."
 
-    return explanation
\ No newline at end of file
+def explain_many(health, anomalies, noise):
+
+    # one explanation per element; arrays (or scalars) broadcast together.
+    # Thresholds and confidence are computed for all rows at once, leaving
+    # only the string formatting per row
+    health, anomalies, noise = np.broadcast_arrays(
+        np.asarray(health), np.asarray(anomalies), np.asarray(noise)
+    )
+
+    status = STATUSES[(health >= 50).astype(np.intp) + (health >= 80)]
+
+    a_level = (anomalies >= 3).astype(np.intp) + (anomalies >= 10)
+    n_level = (noise >= 10).astype(np.intp) + (noise >= 20)
+
+    raw = health - anomalies * 2 - noise * 0.5
+
+    # compute_confidence's min/max return the int bound when clipping
+    confidence = [
+        100 if c > 100 else 5 if c < 5 else round(c, 2)
+        for c in raw.astype(np.float64).ravel().tolist()
+    ]
+
+    return [
+        render(h, s, c, a, n, RISK_TABLE[al][nl])
+        for h, s, c, a, n, al, nl in zip(
+            health.ravel().tolist(), status.ravel().tolist(), confidence,
+            anomalies.ravel().tolist(), noise.ravel().tolist(),
+            a_level.ravel().tolist(), n_level.ravel().tolist()
+        )
+    ]
+
+
+def generate_explanation(prompt):
+
+    # string adapter for callers that still build "health:.. anomalies:..
+    # noise:.." prompts
+    return explain(
+        extract_value(prompt, "health"),
+        extract_value(prompt, "anomalies"),
+        extract_value(prompt, "noise")
+    )
@@ -0,0 +1,187 @@
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+from ai.explainer import compute_status, explain, explain_many
+
+EXPLAIN_CACHE_SIZE = int(os.environ.get("EXPLAIN_CACHE_SIZE", 4096))
+
+# seconds; <= 0 keeps entries until they are evicted
+EXPLAIN_CACHE_TTL = float(os.environ.get("EXPLAIN_CACHE_TTL", 3600))
+
+# precompute every rule-based explanation for health 0-100 and the ranges
+# below at start-up; those entries are pinned (never evicted or expired)
+EXPLAIN_CACHE_WARM = os.environ.get("EXPLAIN_CACHE_WARM", "0") == "1"
+WARM_MAX_ANOMALIES = int(os.environ.get("EXPLAIN_WARM_MAX_ANOMALIES", 25))
+WARM_MAX_NOISE = int(os.environ.get("EXPLAIN_WARM_MAX_NOISE", 30))
+
+
+def explanation_key(health, anomalies, noise, status=None):
+
+    # the resolution /explain has always used: whole health and noise
+    # points; flooring keeps compute_status()'s integer thresholds exact
+    health, anomalies, noise = int(health), int(anomalies), int(noise)
+
+    return health, anomalies, noise, status or compute_status(health)
+
+
+class ExplanationCache:
+
+    # LRU with a per-entry TTL, plus a pinned table for precomputed entries;
+    # concurrent misses on one key compute it once and share the result
+
+    def __init__(self, max_entries=EXPLAIN_CACHE_SIZE, ttl=EXPLAIN_CACHE_TTL):
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries = OrderedDict()
+        self._pinned = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _lookup(self, key, now):
+
+        if key in self._pinned:
+            return self._pinned[key]
+
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        value, expires = entry
+
+        if expires is not None and expires <= now:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+
+        self._entries.move_to_end(key)
+
+        return value
+
+    def _store(self, key, value, now):
+
+        if self.max_entries <= 0:
+            return
+
+        self._entries[key] = (value, now + self.ttl if self.ttl > 0 else None)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+
+        with self._lock:
+
+            value = self._lookup(key, time.monotonic())
+
+            if value is not None:
+                self.hits += 1
+                return value
+
+            self.misses += 1
+
+            future = self._pending.get(key)
+            owner = future is None
+
+            if owner:
+                future = self._pending[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except Exception as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._store(key, value, time.monotonic())
+            del self._pending[key]
+
+        future.set_result(value)
+
+        return value
+
+    def pin(self, items):
+
+        # items: iterable of (key, value)
+        table = dict(items)
+
+        with self._lock:
+            self._pinned.update(table)
+
+        return len(table)
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+            self._pinned.clear()
+
+    def stats(self):
+
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "pinned": len(self._pinned),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+
+rule_cache = ExplanationCache()
+
+chat_cache = ExplanationCache()
+
+
+def cached_explanation(health, anomalies, noise):
+
+    # the old "health:<digits>" prompt parse read negative values as 0
+    key = explanation_key(*(max(0, int(v)) for v in (health, anomalies, noise)))
+
+    return rule_cache.get_or_compute(key, lambda: explain(*key[:3]))
+
+
+def cached_chatbot_response(user_query, health, anomalies, noise, status=None):
+
+    # chatbot_response does not read the query, so it is not part of the
+    # key; the answer is built from the quantized values it is cached under
+    from ai.chatbot import chatbot_response
+
+    key = explanation_key(health, anomalies, noise, status)
+
+    return chat_cache.get_or_compute(key, lambda: chatbot_response(user_query, *key))
+
+
+def warm_rule_cache(max_anomalies=WARM_MAX_ANOMALIES, max_noise=WARM_MAX_NOISE):
+
+    grid = np.array(list(itertools.product(range(101), range(max_anomalies + 1), range(max_noise + 1))))
+
+    health, anomalies, noise = grid.T
+
+    return rule_cache.pin(
+        (explanation_key(h, a, n), text)
+        for (h, a, n), text in zip(grid.tolist(), explain_many(health, anomalies, noise))
+    )
@@ -1,18 +1,362 @@
-import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
 
-MODEL_PATH = "ai/model"
+MODEL_PATH = os.environ.get("EXPLAINER_MODEL_PATH", "ai/model")
 
-tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
-model = AutoModelForCausalLM.from_pretrained(MODEL_PATH)
+# load in the background at API start-up instead of on the first question
+PRELOAD = os.environ.get("EXPLAINER_PRELOAD", "0") == "1"
 
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-model.to(device)
-model.eval()
+# state_dict saved next to the model in torch's zip format, so it can be
+# memory-mapped: every worker process maps the same page-cache pages
+# instead of holding a private copy of the weights
+MMAP_WEIGHTS = "weights.mmap.pt"
 
-def generate_explanation(health, anomalies, noise, status):
+# "int8" serves the dynamic-quantized model written by python -m ai.quantize
+# (or converted on first load); "none" serves the fp32 weights
+QUANTIZE = os.environ.get("EXPLAINER_QUANTIZE", "none")
+QUANTIZE_MODES = ("none", "int8")
+
+MAX_LENGTH = 200
+TEMPERATURE = 0.7
+
+# concurrent prompts arriving within BATCH_WINDOW_MS of the first one are
+# generated together, up to MAX_BATCH at a time
+MAX_BATCH = int(os.environ.get("EXPLAINER_MAX_BATCH", 8))
+BATCH_WINDOW_MS = float(os.environ.get("EXPLAINER_BATCH_WINDOW_MS", 10))
+
+
+def export_mmap_weights(model, path=MODEL_PATH):
+
+    import torch
+
+    # write-then-rename, several workers may race to create it
+    target = os.path.join(path, MMAP_WEIGHTS)
+    tmp = f"{target}.{os.getpid()}.tmp"
+
+    torch.save(model.state_dict(), tmp)
+    os.replace(tmp, target)
+
+    return target
+
+
+def _export_fresh(path, name=MMAP_WEIGHTS):
+
+    # an export is stale once the checkpoint it came from is replaced
+    weights = os.path.join(path, name)
+
+    if not os.path.exists(weights):
+        return False
+
+    exported = os.path.getmtime(weights)
+
+    return all(
+        os.path.getmtime(os.path.join(path, name)) <= exported
+        for name in ("model.safetensors", "pytorch_model.bin")
+        if os.path.exists(os.path.join(path, name))
+    )
+
+
+class ExplainerModel:
+
+    # process-wide tokenizer + model, loaded on first use (or by preload())
+    # exactly once; state is "unloaded", "loading", "ready" or "failed"
+
+    def __init__(self, path=MODEL_PATH, quantize=QUANTIZE):
+
+        if quantize not in QUANTIZE_MODES:
+            raise ValueError(f"Unknown quantization mode: {quantize}")
+
+        self.path = path
+        self.quantize = quantize
+        self.state = "unloaded"
+        self.error = None
+        self.load_seconds = None
+        self.mmap = False
+
+        self.tokenizer = None
+        self.model = None
+        self.device = None
+
+        self._lock = threading.Lock()
+
+    def _load_model(self):
+
+        import torch
+        from transformers import AutoConfig, AutoModelForCausalLM
+        from transformers.modeling_utils import no_init_weights
+
+        if self.quantize == "int8":
+            return self._load_quantized(), False
+
+        weights = os.path.join(self.path, MMAP_WEIGHTS)
+
+        if not _export_fresh(self.path):
+
+            model = AutoModelForCausalLM.from_pretrained(self.path)
+
+            try:
+                export_mmap_weights(model, self.path)
+            except OSError:
+                # read-only model dir: every process keeps its own copy
+                pass
+
+            return model, False
+
+        # parameters are allocated uninitialized (never touched, so never
+        # paged in) and then replaced by tensors backed by the mapped file
+        with no_init_weights():
+            model = AutoModelForCausalLM.from_config(AutoConfig.from_pretrained(self.path))
+
+        state = torch.load(weights, mmap=True, weights_only=True)
+        model.load_state_dict(state, assign=True)
+        model.tie_weights()
+
+        return model, True
+
+    def _load_quantized(self):
+
+        from transformers import AutoModelForCausalLM
+
+        from ai.quantize import QUANT_WEIGHTS, export_quantized, load_quantized, quantize_int8
+
+        if _export_fresh(self.path, QUANT_WEIGHTS):
+            return load_quantized(self.path)
+
+        model = quantize_int8(AutoModelForCausalLM.from_pretrained(self.path))
+
+        try:
+            export_quantized(model, self.path)
+        except OSError:
+            pass
+
+        return model
+
+    def load(self):
+
+        if self.state == "ready":
+            return self
+
+        with self._lock:
+
+            if self.state == "ready":
+                return self
+
+            self.state = "loading"
+            start = time.perf_counter()
+
+            try:
+                import torch
+                from transformers import AutoTokenizer
+
+                self.tokenizer = AutoTokenizer.from_pretrained(self.path)
+
+                model, self.mmap = self._load_model()
+
+                # quantized kernels are CPU-only
+                cuda = torch.cuda.is_available() and self.quantize == "none"
+
+                self.device = torch.device("cuda" if cuda else "cpu")
+
+                model.to(device=self.device)
+                model.eval()
+
+                self.model = model
+                self.error = None
+                self.state = "ready"
+
+            except Exception as e:
+                self.error = str(e)
+                self.state = "failed"
+                raise
+
+            finally:
+                self.load_seconds = time.perf_counter() - start
+
+        return self
+
+    def preload(self):
+
+        # background load; failures are reported through status()
+        def run():
+            try:
+                self.load()
+            except Exception:
+                pass
+
+        thread = threading.Thread(target=run, name="explainer-preload", daemon=True)
+        thread.start()
+
+        return thread
 
-    prompt = f"""
+    def status(self):
+
+        return {
+            "state": self.state,
+            "path": self.path,
+            "quantize": self.quantize,
+            "mmap": self.mmap,
+            "load_seconds": self.load_seconds,
+            "error": self.error
+        }
+
+
+explainer = ExplainerModel()
+
+
+class BatchGenerator:
+
+    # one worker thread owns generation: it takes the first waiting prompt,
+    # collects whatever else arrives within the window, left-pads the batch
+    # and runs a single generate() with the KV cache for all of them
+
+    def __init__(self, holder=explainer, max_batch=MAX_BATCH, window_ms=BATCH_WINDOW_MS,
+                 max_length=MAX_LENGTH, temperature=TEMPERATURE):
+
+        self.holder = holder
+        self.max_batch = max(1, max_batch)
+        self.window = window_ms / 1000
+        self.max_length = max_length
+        self.temperature = temperature
+
+        self.batches = 0
+        self.prompts = 0
+        self.generated_tokens = 0
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, prompt):
+
+        future = Future()
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="explainer-batcher", daemon=True)
+                self._thread.start()
+
+        self._queue.put((prompt, future))
+
+        return future
+
+    def generate(self, prompt):
+
+        return self.submit(prompt).result()
+
+    def _collect(self):
+
+        first = self._queue.get()
+
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.perf_counter() + self.window
+
+        while len(batch) < self.max_batch:
+
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                break
+
+            if item is None:
+                # finish this batch, stop on the next round
+                self._queue.put(None)
+                break
+
+            batch.append(item)
+
+        return batch
+
+    def _worker(self):
+
+        while True:
+
+            batch = self._collect()
+
+            if batch is None:
+                return
+
+            batch = [(p, f) for p, f in batch if f.set_running_or_notify_cancel()]
+
+            if not batch:
+                continue
+
+            try:
+                texts = self._generate([p for p, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), text in zip(batch, texts):
+                future.set_result(text)
+
+    def _generate(self, prompts):
+
+        import torch
+
+        self.holder.load()
+
+        tokenizer, model, device = self.holder.tokenizer, self.holder.model, self.holder.device
+
+        # decoder-only models continue from the right edge, so pad on the left
+        tokenizer.padding_side = "left"
+
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+
+        inputs = tokenizer(prompts, return_tensors="pt", padding=True).to(device)
+
+        with torch.inference_mode():
+            output = model.generate(
+                **inputs,
+                max_length=self.max_length,
+                temperature=self.temperature,
+                do_sample=True,
+                use_cache=True,
+                pad_token_id=tokenizer.pad_token_id
+            )
+
+        new_tokens = output[:, inputs["input_ids"].shape[1]:]
+
+        self.batches += 1
+        self.prompts += len(prompts)
+        self.generated_tokens += int((new_tokens != tokenizer.pad_token_id).sum())
+
+        return tokenizer.batch_decode(output, skip_special_tokens=True)
+
+    def stats(self):
+
+        return {
+            "max_batch": self.max_batch,
+            "window_ms": self.window * 1000,
+            "batches": self.batches,
+            "prompts": self.prompts,
+            "mean_batch": self.prompts / self.batches if self.batches else None,
+            "generated_tokens": self.generated_tokens,
+            "queued": self._queue.qsize()
+        }
+
+    def shutdown(self):
+
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+
+
+batcher = BatchGenerator()
+
+
+def build_prompt(health, anomalies, noise, status):
+
+    return f"""
     Health: {health}
     Anomalies: {anomalies}
     Noise: {noise}
@@ -20,15 +364,19 @@ def generate_explanation(health, anomalies, noise, status):
     Explanation:
     """
 
-    inputs = tokenizer(prompt, return_tensors="pt").to(device)
 
-    output = model.generate(
-        **inputs,
-        max_length=200,
-        temperature=0.7,
-        do_sample=True
-    )
+def generate_explanation(health, anomalies, noise, status):
 
-    text = tokenizer.decode(output[0], skip_special_tokens=True)
+    # blocks the calling worker thread; concurrent callers share one batch
+    text = batcher.generate(build_prompt(health, anomalies, noise, status))
 
     return text.split("Explanation:")[-1].strip()
+
+
+if __name__ == "__main__":
+
+    # python -m ai.inference: write the mmap weights for MODEL_PATH ahead of
+    # deployment, so no worker has to do it on first load
+    from transformers import AutoModelForCausalLM
+
+    print("Wrote:", export_mmap_weights(AutoModelForCausalLM.from_pretrained(MODEL_PATH)))
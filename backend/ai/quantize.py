@@ -0,0 +1,159 @@
+import argparse
+import os
+
+import torch
+from torch import nn
+
+# int8 dynamic quantization for CPU serving: Linear weights are stored as
+# int8 and activations are quantized on the fly per batch, so there is no
+# calibration step; embeddings and layer norms stay fp32
+QUANT_WEIGHTS = "weights.int8.pt"
+
+
+def conv1d_to_linear(model):
+
+    # GPT-2 keeps its projections in transformers' Conv1D (x @ W + b, with W
+    # stored transposed), which quantize_dynamic does not recognise
+    from transformers.pytorch_utils import Conv1D
+
+    for name, child in model.named_children():
+
+        if isinstance(child, Conv1D):
+
+            linear = nn.Linear(child.weight.shape[0], child.nf, device="meta")
+            linear.weight = nn.Parameter(child.weight.detach().t().contiguous(), requires_grad=False)
+            linear.bias = nn.Parameter(child.bias.detach(), requires_grad=False)
+
+            setattr(model, name, linear)
+
+        else:
+            conv1d_to_linear(child)
+
+    return model
+
+
+def quantize_int8(model):
+
+    model = conv1d_to_linear(model.eval())
+
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def _quantized_linears(model):
+
+    from torch.ao.nn.quantized.dynamic import Linear as QuantizedLinear
+
+    return [(name, module) for name, module in model.named_modules() if isinstance(module, QuantizedLinear)]
+
+
+def plain_state_dict(model):
+
+    # the packed int8 params (and their torch.qint8 dtype) are not accepted
+    # by the weights-only unpickler, so each projection is stored as its
+    # int8 values plus the per-tensor scale and zero point
+    state = {key: value for key, value in model.state_dict().items() if "_packed_params" not in key}
+
+    for name, module in _quantized_linears(model):
+
+        weight, bias = module._weight_bias()
+
+        state[f"{name}.weight_int8"] = weight.int_repr()
+        state[f"{name}.weight_scale"] = torch.tensor(weight.q_scale(), dtype=torch.float64)
+        state[f"{name}.weight_zero_point"] = torch.tensor(weight.q_zero_point(), dtype=torch.int64)
+
+        if bias is not None:
+            state[f"{name}.bias"] = bias
+
+    return state
+
+
+def packed_state_dict(model, state):
+
+    # inverse of plain_state_dict; starts from the model's own state_dict so
+    # the module versions the quantized loaders check come along
+    packed = model.state_dict()
+
+    for name, _ in _quantized_linears(model):
+
+        weight = torch._make_per_tensor_quantized_tensor(
+            state.pop(f"{name}.weight_int8"),
+            state.pop(f"{name}.weight_scale").item(),
+            state.pop(f"{name}.weight_zero_point").item()
+        )
+
+        packed[f"{name}._packed_params.dtype"] = torch.qint8
+        packed[f"{name}._packed_params._packed_params"] = (weight, state.pop(f"{name}.bias", None))
+
+    packed.update(state)
+
+    return packed
+
+
+def export_quantized(model, path):
+
+    # model: the quantized module; write-then-rename like the mmap export
+    target = os.path.join(path, QUANT_WEIGHTS)
+    tmp = f"{target}.{os.getpid()}.tmp"
+
+    torch.save(plain_state_dict(model), tmp)
+    os.replace(tmp, target)
+
+    return target
+
+
+def quantized_layout(model):
+
+    # swap every projection for an empty int8 dynamic Linear, the module
+    # quantize_dynamic would produce, without reading (or quantizing) the
+    # uninitialized fp32 weights, which may hold NaNs its observers reject
+    from torch.ao.nn.quantized.dynamic import Linear as QuantizedLinear
+    from transformers.pytorch_utils import Conv1D
+
+    for name, child in model.named_children():
+
+        if isinstance(child, Conv1D):
+            setattr(model, name, QuantizedLinear(child.weight.shape[0], child.nf, dtype=torch.qint8))
+
+        elif isinstance(child, nn.Linear):
+            setattr(model, name, QuantizedLinear(
+                child.in_features, child.out_features, bias_=child.bias is not None, dtype=torch.qint8
+            ))
+
+        else:
+            quantized_layout(child)
+
+    return model
+
+
+def load_quantized(path):
+
+    from transformers import AutoConfig, AutoModelForCausalLM
+    from transformers.modeling_utils import no_init_weights
+
+    # rebuild the quantized module layout from the config, then fill it in
+    with no_init_weights():
+        model = quantized_layout(AutoModelForCausalLM.from_config(AutoConfig.from_pretrained(path)))
+
+    model.eval()
+
+    state = torch.load(os.path.join(path, QUANT_WEIGHTS), weights_only=True)
+    model.load_state_dict(packed_state_dict(model, state))
+
+    return model
+
+
+if __name__ == "__main__":
+
+    # python -m ai.quantize: convert the fine-tuned model ahead of deployment
+    # and serve it with EXPLAINER_QUANTIZE=int8
+    from transformers import AutoModelForCausalLM
+
+    from ai.inference import MODEL_PATH
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    model = quantize_int8(AutoModelForCausalLM.from_pretrained(args.model_path))
+
+    print("Wrote:", export_quantized(model, args.model_path))
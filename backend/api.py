@@ -1,18 +1,124 @@
+import json
 import os
 os.environ["TF_ENABLE_ONEDNN_OPTS"] = "0"
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from fastapi import (
+    FastAPI, UploadFile, File, HTTPException, Form, Request, WebSocket, WebSocketDisconnect
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from starlette.requests import ClientDisconnect
+from typing import List, Dict, Any, Optional
 
-import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
+
+from models.cache import model_cache
+from models.registry import model_registry
+from pipeline import SCORING_MODES, Pipeline, frame_from_records
+from utils.fusion import FUSION_STRATEGIES
+from jobs import JobManager
+from executors import Executors
+from telemetry import TelemetryHub
+from store import TimeSeriesStore
+from dataset_store import dataset_store
+from ai.inference import PRELOAD as PRELOAD_EXPLAINER, batcher, explainer
+from ai.explanation_cache import (
+    EXPLAIN_CACHE_WARM, cached_chatbot_response, cached_explanation, chat_cache, rule_cache, warm_rule_cache
+)
+from utils.ingest import inspect_csv, read_sensor_columns
+from utils.metrics import registry, stage_seconds
+from utils.serialization import BINARY_MEDIA_TYPE, encode_arrays, wants_binary
+from utils.downsample import downsample_indices
 
 app = FastAPI(title="Hybrid Digital Twin API")
 
+executors = Executors()
+
+pipeline = Pipeline(executors=executors)
+
+pipeline.add_hook(lambda stage, seconds: stage_seconds.observe(seconds, stage=stage))
+
+
+def _cache_metrics():
+
+    stats = model_cache.stats()
+
+    return [
+        ("model_cache_hits_total", "counter", "Fitted model cache hits.", stats["hits"] + stats["disk_hits"]),
+        ("model_cache_misses_total", "counter", "Fitted model cache misses.", stats["misses"]),
+        ("model_cache_evictions_total", "counter", "Fitted model cache evictions.", stats["evictions"]),
+        ("model_cache_bytes", "gauge", "Bytes held by the in-memory model cache.", stats["bytes"]),
+    ]
+
+
+registry.add_collector(_cache_metrics)
+
+jobs = JobManager()
+
+store = TimeSeriesStore()
+
+telemetry = TelemetryHub(store)
+
+
+def _telemetry_metrics():
+
+    stats = telemetry.stats()
+
+    return [
+        ("telemetry_assets", "gauge", "Assets with a live telemetry stream.", stats["assets"]),
+        ("telemetry_samples_total", "counter", "Telemetry samples scored.", stats["samples"]),
+    ]
+
+
+registry.add_collector(_telemetry_metrics)
+
+
+def _generation_metrics():
+
+    stats = batcher.stats()
+
+    return [
+        ("explainer_batches_total", "counter", "Batched generate() calls.", stats["batches"]),
+        ("explainer_prompts_total", "counter", "Explanation prompts generated.", stats["prompts"]),
+        ("explainer_generated_tokens_total", "counter", "Tokens generated by the explainer.", stats["generated_tokens"]),
+        ("explainer_queued_prompts", "gauge", "Prompts waiting for the next batch.", stats["queued"]),
+    ]
+
+
+registry.add_collector(_generation_metrics)
+
+
+def _explanation_cache_metrics():
+
+    rules, chats = rule_cache.stats(), chat_cache.stats()
+
+    return [
+        ("explanation_cache_hits_total", "counter", "Rule-based explanation cache hits.", rules["hits"]),
+        ("explanation_cache_misses_total", "counter", "Rule-based explanation cache misses.", rules["misses"]),
+        ("chat_cache_hits_total", "counter", "Chatbot response cache hits.", chats["hits"]),
+        ("chat_cache_misses_total", "counter", "Chatbot response cache misses.", chats["misses"]),
+    ]
+
+
+registry.add_collector(_explanation_cache_metrics)
+
+
+@app.on_event("startup")
+def preload_models():
+    if PRELOAD_EXPLAINER:
+        explainer.preload()
+    if EXPLAIN_CACHE_WARM:
+        warm_rule_cache()
+
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    jobs.shutdown()
+    batcher.shutdown()
+    executors.shutdown()
+
 
 # ─────────────────────────────────────
 # CORS (REQUIRED FOR REACT)
@@ -32,10 +138,46 @@ app.add_middleware(
 # ─────────────────────────────────────
 
 class RunModelRequest(BaseModel):
+    data: List[Dict[str, Any]] = []
+    sensors: List[str]
+    model: str
+    horizon: int
+    timings: bool = False
+    max_points: Optional[int] = None
+    model_id: Optional[str] = None
+    scoring: str = "fused"
+    fusion: str = "mean"
+    # score stored data instead of data: the last window rows of asset_id's
+    # history or of an ingested dataset
+    asset_id: Optional[str] = None
+    dataset_id: Optional[str] = None
+    window: Optional[int] = None
+
+
+class TrainModelRequest(BaseModel):
+    asset_id: str
     data: List[Dict[str, Any]]
     sensors: List[str]
     model: str
+    fusion: str = "mean"
+
+
+class BatchAsset(BaseModel):
+    asset_id: str
+    data: Dict[str, List[Optional[float]]]
+    sensors: List[str] = []
+
+
+class RunBatchRequest(BaseModel):
+    assets: List[BatchAsset]
+    model: str
     horizon: int
+    timings: bool = False
+    fusion: str = "mean"
+
+
+class AppendSamplesRequest(BaseModel):
+    data: Dict[str, List[Optional[float]]]
 
 
 class ExplainRequest(BaseModel):
@@ -44,6 +186,17 @@ class ExplainRequest(BaseModel):
     noise: float
 
 
+class ExplainBatchRequest(BaseModel):
+    assets: List[ExplainRequest]
+
+
+class ChatRequest(BaseModel):
+    query: str = ""
+    health: float
+    anomalies: int
+    noise: float
+
+
 # ─────────────────────────────────────
 # ROOT
 # ─────────────────────────────────────
@@ -53,22 +206,175 @@ def home():
     return {"message": "Hybrid Digital Twin API running"}
 
 
+@app.get("/ready")
+def ready():
+
+    # with EXPLAINER_PRELOAD=1 the instance only takes traffic once the
+    # language model is loaded; otherwise it loads lazily on first /chat
+    status = explainer.status()
+
+    if PRELOAD_EXPLAINER and status["state"] != "ready":
+        return JSONResponse(status_code=503, content={"ready": False, "explainer": status})
+
+    return {"ready": True, "explainer": status, "generation": batcher.stats()}
+
+
+@app.get("/model-cache")
+def model_cache_stats():
+    return model_cache.stats()
+
+
+@app.get("/explain-cache")
+def explain_cache_stats():
+    return {"explain": rule_cache.stats(), "chat": chat_cache.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 # ─────────────────────────────────────
-# CSV PREVIEW
+# RESPONSE HELPERS
 # ─────────────────────────────────────
-@app.post("/preview-csv")
-async def preview_csv(file: UploadFile = File(...)):
+
+def _require_option(value, allowed, name):
+
+    # checked at the request boundary so a bad option is a 400, not a 500
+    # from deep inside the pipeline
+    if value not in allowed:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {name}: {value}. Expected one of {list(allowed)}"
+        )
+
+
+def _records(request, sensors=None):
+
+    # the request's own rows, or a window of stored data
+    if request.window is not None and request.window <= 0:
+        raise HTTPException(status_code=400, detail="window must be a positive number of rows")
+
+    if request.dataset_id:
+        try:
+            return dataset_store.open(request.dataset_id, sensors or request.sensors, request.window)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Dataset not found")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    if not request.asset_id:
+        return request.data
 
     try:
+        return store.window(request.asset_id, request.window)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+
+def _downsample(result, max_points):
+
+    # chart payloads: keep the LTTB shape of the signal plus every anomaly,
+    # anomaly indices stay in full-resolution positions
+    index = downsample_indices(result["actual"], max_points, result["anomalies"])
+
+    return {
+        **result,
+        "actual": np.asarray(result["actual"])[index],
+        "predicted": np.asarray(result["predicted"])[index],
+        "index": index,
+        "total_points": len(result["actual"])
+    }
+
+
+def _model_response(result, sensors, timings=None, binary=False, max_points=None):
+
+    if max_points:
+        with pipeline.stage("downsample", timings):
+            result = _downsample(result, max_points)
+
+    if binary:
+        return _binary_model_response(result, sensors, timings)
+
+    with pipeline.stage("serialization", timings):
+
+        # FIX JSON CRASH
+        response = {
+            "actual": np.nan_to_num(result["actual"]).tolist(),
+            "predicted": np.nan_to_num(result["predicted"]).tolist(),
+            "future": np.nan_to_num(result["future"]).tolist(),
+            "anomalies": result["anomalies"].tolist(),
+            "health": result["health"],
+            "noise": result["noise"],
+            "sensors_used": sensors
+        }
+
+        if "index" in result:
+            response["index"] = result["index"].tolist()
+            response["total_points"] = result["total_points"]
+
+        if "anomaly_sensors" in result:
+            response["anomaly_sensors"] = result["anomaly_sensors"]
+
+        if "dataset_id" in result:
+            response["dataset_id"] = result["dataset_id"]
+
+    if timings is not None:
+        response["timings"] = timings
 
-        print("CSV PREVIEW START")
+    return response
 
-        df = pd.read_csv(file.file)
 
-        df.columns = df.columns.str.strip().str.lower()
+def _binary_model_response(result, sensors, timings=None):
 
-        # remove index columns
-        df = df.loc[:, ~df.columns.str.contains("^unnamed")]
+    with pipeline.stage("serialization", timings):
+
+        arrays = {
+            "actual": np.nan_to_num(result["actual"]).astype("<f4"),
+            "predicted": np.nan_to_num(result["predicted"]).astype("<f4"),
+            "future": np.nan_to_num(result["future"]).astype("<f4"),
+            "anomalies": result["anomalies"].astype("<i4")
+        }
+
+        meta = {
+            "health": result["health"],
+            "noise": result["noise"],
+            "sensors_used": sensors
+        }
+
+        if "index" in result:
+            arrays["index"] = result["index"].astype("<i4")
+            meta["total_points"] = result["total_points"]
+
+        if "anomaly_sensors" in result:
+            meta["anomaly_sensors"] = result["anomaly_sensors"]
+
+        if "dataset_id" in result:
+            meta["dataset_id"] = result["dataset_id"]
+
+        if timings is not None:
+            meta["timings"] = timings
+
+        chunks = encode_arrays(arrays, meta)
+
+    return StreamingResponse(
+        iter(chunks),
+        media_type=BINARY_MEDIA_TYPE,
+        headers={"Content-Length": str(sum(len(c) for c in chunks))}
+    )
+
+
+# ─────────────────────────────────────
+# CSV PREVIEW
+# ─────────────────────────────────────
+@app.post("/preview-csv")
+async def preview_csv(file: UploadFile = File(...)):
+
+    try:
+
+        # only the first chunk is parsed, the rest of the upload is never read
+        with pipeline.stage("parse"):
+            df, _ = await executors.run_async(inspect_csv, file.file)
 
         # replace invalid numeric values
         df = df.replace([np.inf, -np.inf], np.nan)
@@ -78,8 +384,6 @@ async def preview_csv(file: UploadFile = File(...)):
 
         preview = df.head(5)
 
-        print("CSV PREVIEW DONE")
-
         return {
             "columns": df.columns.tolist(),
             "numeric_columns": numeric_cols,
@@ -96,28 +400,33 @@ async def preview_csv(file: UploadFile = File(...)):
 
 @app.post("/upload-csv")
 async def upload_csv(
+    http_request: Request,
     file: UploadFile = File(...),
     sensors: str = Form(""),
-    model: str = Form("Random Forest")
+    model: str = Form("Random Forest"),
+    horizon: int = Form(10),
+    timings: bool = Form(False),
+    max_points: Optional[int] = Form(None),
+    scoring: str = Form("fused"),
+    fusion: str = Form("mean"),
+    persist: bool = Form(False)
 ):
 
     try:
 
-        print("STEP 1 CSV: reading file")
-
-        from utils.data_quality import compute_data_quality
-        from utils.fusion import fuse_sensors
-        from utils.anomaly import compute_anomalies_and_health
+        _require_option(scoring, SCORING_MODES, "scoring mode")
+        _require_option(fusion, FUSION_STRATEGIES, "fusion strategy")
 
-        df = pd.read_csv(file.file)
+        timings = {} if timings else None
 
-        df.columns = df.columns.str.strip().str.lower()
+        # sniffing the header is its own stage so "parse" is observed once
+        # per request
+        with pipeline.stage("inspect", timings):
+            head, raw_names = await executors.run_async(inspect_csv, file.file)
 
-        df = df.loc[:, ~df.columns.str.contains("^unnamed")]
+        numeric_head = head.select_dtypes(include=np.number)
 
-        numeric_df = df.select_dtypes(include=np.number)
-
-        if len(numeric_df.columns) == 0:
+        if len(numeric_head.columns) == 0:
             raise HTTPException(
                 status_code=400,
                 detail="CSV must contain numeric sensor columns."
@@ -127,7 +436,7 @@ async def upload_csv(
 
             sensors = [s.strip().lower() for s in sensors.split(",")]
 
-            sensors = [s for s in sensors if s in numeric_df.columns]
+            sensors = [s for s in sensors if s in numeric_head.columns]
 
             if len(sensors) == 0:
                 raise HTTPException(
@@ -136,66 +445,110 @@ async def upload_csv(
                 )
 
         else:
-            sensors = numeric_df.columns.tolist()
+            sensors = numeric_head.columns.tolist()
+
+        dataset_id = None
 
-        print("STEP 2 CSV: sensors selected", sensors)
+        with pipeline.stage("parse", timings):
 
-        dq = compute_data_quality(numeric_df, sensors)
+            if persist:
+                # parse every numeric column once into a columnar dataset;
+                # later runs reference dataset_id instead of re-uploading
+                manifest = await executors.run_async(
+                    dataset_store.ingest_csv, file.file, file.filename or "dataset"
+                )
+                dataset_id = manifest["dataset_id"]
 
-        print("STEP 3 CSV: data quality complete")
+                numeric_df = await executors.run_async(
+                    dataset_store.open, dataset_id, sensors
+                )
 
-        fused = fuse_sensors(dq["filled_df"], sensors)
+            else:
+                # stream the remaining rows, parsing only the selected sensor columns
+                numeric_df = await executors.run_async(
+                    read_sensor_columns, file.file, raw_names, sensors
+                )
 
-        print("STEP 4 CSV: fusion complete")
+        result = await executors.run_async(
+            pipeline.run, numeric_df, sensors, model, horizon,
+            timings=timings, scoring=scoring, fusion=fusion
+        )
 
-        scaler = MinMaxScaler()
+        if dataset_id is not None:
+            result["dataset_id"] = dataset_id
 
-        print("STEP 5 CSV: running model", model)
+        return await executors.run_async(
+            _model_response, result, sensors, timings,
+            binary=wants_binary(http_request.headers.get("accept")),
+            max_points=max_points
+        )
 
-        if model == "Linear Regression":
+    except HTTPException:
+        raise
 
-            from models.linear_model import run_linear_regression
-            actual = fused
-            predicted = run_linear_regression(fused)
+    except Exception as e:
 
-        elif model == "Random Forest":
+        import traceback
+        traceback.print_exc()
 
-            from models.random_forest import run_random_forest
-            actual = fused
-            predicted = run_random_forest(fused)
+        raise HTTPException(status_code=500, detail=str(e))
 
-        elif model == "LSTM":
 
-            from models.lstm_model import run_lstm
-            actual, predicted = run_lstm(fused, scaler)
+# ─────────────────────────────────────
+# SIMULATED DATA MODEL RUN
+# ─────────────────────────────────────
 
-        else:
+@app.post("/run-model")
+async def run_model(request: RunModelRequest, http_request: Request):
 
-            from models.autoencoder import run_autoencoder
-            actual, predicted = run_autoencoder(fused, scaler)
+    try:
 
-        print("STEP 6 CSV: model finished")
+        _require_option(request.scoring, SCORING_MODES, "scoring mode")
+        _require_option(request.fusion, FUSION_STRATEGIES, "fusion strategy")
 
-        anomalies, error, health = compute_anomalies_and_health(actual, predicted)
+        timings = {} if request.timings else None
 
-        print("STEP 7 CSV: anomaly detection done")
+        model_type, fitted, fusion, trained = request.model, None, request.fusion, None
 
-        # FIX JSON CRASH
-        actual = np.nan_to_num(actual)
-        predicted = np.nan_to_num(predicted)
-        anomalies = np.nan_to_num(anomalies)
+        if request.model_id:
+            try:
+                meta, fitted = await executors.run_async(model_registry.load, request.model_id)
+            except KeyError:
+                raise HTTPException(status_code=404, detail="Model not found")
+            # score on the signal the stored model was trained on
+            model_type, fusion, trained = meta["model"], meta.get("fusion", "mean"), meta["sensors"]
 
-        health_val = float(np.nan_to_num(np.mean(health)))
-        noise_val = float(np.nan_to_num(dq["noise"]))
+        with pipeline.stage("parse", timings):
+            try:
+                numeric_df, sensors = await executors.run_async(
+                    frame_from_records, _records(request, trained), trained or request.sensors
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
 
-        return {
-            "actual": actual.tolist(),
-            "predicted": predicted.tolist(),
-            "anomalies": anomalies.tolist(),
-            "health": health_val,
-            "noise": noise_val,
-            "sensors_used": sensors
-        }
+        if trained is not None:
+
+            missing = [s for s in trained if s not in sensors]
+
+            if missing:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Data is missing sensors the model was trained on: {missing}"
+                )
+
+        result = await executors.run_async(
+            pipeline.run, numeric_df, sensors, model_type, request.horizon,
+            timings=timings, fitted=fitted, scoring=request.scoring, fusion=fusion
+        )
+
+        return await executors.run_async(
+            _model_response, result, sensors, timings,
+            binary=wants_binary(http_request.headers.get("accept")),
+            max_points=request.max_points
+        )
+
+    except HTTPException:
+        raise
 
     except Exception as e:
 
@@ -206,109 +559,366 @@ async def upload_csv(
 
 
 # ─────────────────────────────────────
-# SIMULATED DATA MODEL RUN
+# BATCH SCORING
 # ─────────────────────────────────────
 
-@app.post("/run-model")
-async def run_model(request: RunModelRequest):
+def _batch_response(results):
+
+    for result in results:
+        if "error" not in result:
+            result["future"] = np.nan_to_num(result["future"]).tolist()
+            result["anomalies"] = result["anomalies"].tolist()
+
+    return results
+
+
+@app.post("/run-batch")
+async def run_batch(request: RunBatchRequest):
 
     try:
 
-        print("STEP 1: request received")
+        _require_option(request.fusion, FUSION_STRATEGIES, "fusion strategy")
 
-        from utils.data_quality import compute_data_quality
-        from utils.fusion import fuse_sensors
-        from utils.anomaly import compute_anomalies_and_health
+        timings = {} if request.timings else None
 
-        df = pd.DataFrame(request.data)
+        # plain columns: pydantic has already parsed the arrays
+        assets = [(a.asset_id, a.data, a.sensors) for a in request.assets]
 
-        if df.empty:
-            raise HTTPException(status_code=400, detail="No data received")
+        results = await executors.run_async(
+            pipeline.run_batch, assets, request.model, request.horizon,
+            timings=timings, fusion=request.fusion
+        )
 
-        df.columns = df.columns.str.strip().str.lower()
+        response = {"results": _batch_response(results)}
 
-        numeric_df = df.select_dtypes(include=np.number)
+        if timings is not None:
+            response["timings"] = timings
 
-        if numeric_df.shape[1] == 0:
-            raise HTTPException(
-                status_code=400,
-                detail="No numeric columns in data"
+        return response
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+
+        import traceback
+        traceback.print_exc()
+
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ─────────────────────────────────────
+# MODEL REGISTRY
+# ─────────────────────────────────────
+
+@app.post("/models/train")
+async def train_model(request: TrainModelRequest):
+
+    try:
+
+        _require_option(request.fusion, FUSION_STRATEGIES, "fusion strategy")
+
+        try:
+            numeric_df, sensors = await executors.run_async(
+                frame_from_records, request.data, request.sensors
             )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        spec, fitted, dq = await executors.run_async(
+            pipeline.train, numeric_df, sensors, request.model, request.fusion
+        )
+
+        return await executors.run_async(
+            model_registry.save,
+            request.asset_id, sensors, spec.name, fitted,
+            {
+                "rows": len(numeric_df),
+                "fusion": request.fusion,
+                "quality_score": float(dq["quality_score"]),
+                "noise": float(np.nan_to_num(dq["noise"]))
+            }
+        )
+
+    except HTTPException:
+        raise
 
-        sensors = [s.lower() for s in request.sensors]
+    except Exception as e:
 
-        sensors = [s for s in sensors if s in numeric_df.columns]
+        import traceback
+        traceback.print_exc()
 
-        if len(sensors) == 0:
-            sensors = numeric_df.columns.tolist()
+        raise HTTPException(status_code=500, detail=str(e))
 
-        print("STEP 2: sensors selected", sensors)
 
-        dq = compute_data_quality(numeric_df, sensors)
+@app.get("/models")
+def list_models(asset_id: Optional[str] = None):
+    return model_registry.list(asset_id)
 
-        print("STEP 3: data quality complete")
 
-        fused = fuse_sensors(dq["filled_df"], sensors)
+# ─────────────────────────────────────
+# BACKGROUND JOBS
+# ─────────────────────────────────────
 
-        print("STEP 4: sensor fusion complete")
+@app.post("/jobs")
+async def submit_job(request: RunModelRequest):
 
-        scaler = MinMaxScaler()
+    _require_option(request.scoring, SCORING_MODES, "scoring mode")
+    _require_option(request.fusion, FUSION_STRATEGIES, "fusion strategy")
 
-        model_type = request.model
+    trained = None
 
-        print("STEP 5: running model", model_type)
+    if request.model_id:
+        try:
+            trained = model_registry.meta(request.model_id)["sensors"]
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Model not found")
 
-        if model_type == "Linear Regression":
+    job = jobs.submit(
+        _records(request, trained), trained or request.sensors, request.model, request.horizon,
+        {
+            "scoring": request.scoring,
+            "fusion": request.fusion,
+            "model_id": request.model_id,
+            "timings": request.timings
+        }
+    )
 
-            from models.linear_model import run_linear_regression
-            actual = fused
-            predicted = run_linear_regression(fused)
+    return job.to_dict()
 
-        elif model_type == "Random Forest":
 
-            from models.random_forest import run_random_forest
-            actual = fused
-            predicted = run_random_forest(fused)
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, max_points: Optional[int] = None):
 
-        elif model_type == "LSTM":
+    job = jobs.get(job_id)
 
-            from models.lstm_model import run_lstm
-            actual, predicted = run_lstm(fused, scaler)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
 
-        else:
+    response = job.to_dict()
 
-            from models.autoencoder import run_autoencoder
-            actual, predicted = run_autoencoder(fused, scaler)
+    if job.status == "done":
 
-        print("STEP 6: model completed")
+        # the job's own stage timings, plus this response's serialization
+        timings = job.result.get("timings")
 
-        anomalies, error, health = compute_anomalies_and_health(actual, predicted)
+        response["result"] = await executors.run_async(
+            _model_response, job.result, job.result["sensors_used"],
+            dict(timings) if timings is not None else None, max_points=max_points
+        )
 
-        print("STEP 7: anomaly detection complete")
+    return response
 
-        # FIX JSON CRASH
-        actual = np.nan_to_num(actual)
-        predicted = np.nan_to_num(predicted)
-        anomalies = np.nan_to_num(anomalies)
 
-        health_val = float(np.nan_to_num(np.mean(health)))
-        noise_val = float(np.nan_to_num(dq["noise"]))
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
 
-        return {
-            "actual": actual.tolist(),
-            "predicted": predicted.tolist(),
-            "anomalies": anomalies.tolist(),
-            "health": health_val,
-            "noise": noise_val,
-            "sensors_used": sensors
-        }
+    job = jobs.cancel(job_id)
 
-    except Exception as e:
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
 
-        import traceback
-        traceback.print_exc()
+    return job.to_dict()
+
+
+# ─────────────────────────────────────
+# LIVE TELEMETRY
+# ─────────────────────────────────────
+
+async def _telemetry_event(message):
+
+    # one micro-batch in, one score event out; bad input answers with an
+    # error event instead of closing the stream
+    try:
+        return await executors.run_async(telemetry.push, message)
+    except (TypeError, ValueError) as e:
+        asset_id = message.get("asset_id") if isinstance(message, dict) else None
+        return {"type": "error", "asset_id": asset_id, "detail": str(e)}
+
+
+@app.websocket("/ws/telemetry")
+async def telemetry_socket(websocket: WebSocket):
+
+    await websocket.accept()
+
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except json.JSONDecodeError as e:
+                await websocket.send_json({"type": "error", "asset_id": None, "detail": str(e)})
+                continue
+
+            await websocket.send_json(await _telemetry_event(message))
+
+    except WebSocketDisconnect:
+        pass
+
+
+class DuplexStreamingResponse(StreamingResponse):
+
+    # the body generator reads the request itself while the response is
+    # streaming, so the default disconnect listener must not compete with it
+    # for receive(); a disconnect ends request.stream() instead
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+
+@app.post("/telemetry/stream")
+async def telemetry_stream(request: Request):
+
+    # chunked HTTP alternative for gateways without WebSocket support:
+    # newline-delimited JSON messages in, one JSON event line out per message
+    async def events():
+
+        pending = b""
+
+        try:
+            async for chunk in request.stream():
+
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+
+                for line in lines:
+                    if line.strip():
+                        yield await _line_event(line)
+
+        except ClientDisconnect:
+            return
+
+        if pending.strip():
+            yield await _line_event(pending)
+
+    return DuplexStreamingResponse(events(), media_type="application/x-ndjson")
+
+
+async def _line_event(line):
+
+    try:
+        event = await _telemetry_event(json.loads(line))
+    except json.JSONDecodeError as e:
+        event = {"type": "error", "asset_id": None, "detail": str(e)}
+
+    return json.dumps(event) + "\n"
+
+
+@app.get("/telemetry")
+def telemetry_stats():
+    return telemetry.stats()
 
-        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/telemetry/{asset_id}")
+def telemetry_state(asset_id: str):
+
+    stream = telemetry.get(asset_id)
+
+    if stream is None:
+        raise HTTPException(status_code=404, detail="Asset not streaming")
+
+    # the samples themselves are in the store: GET /assets/{asset_id}/window
+    return {
+        "asset_id": asset_id,
+        "sensors": stream.sensors,
+        "samples": stream.seen,
+        "health": stream.health,
+        "fusion": stream.fusion
+    }
+
+
+@app.delete("/telemetry/{asset_id}")
+def telemetry_remove(asset_id: str):
+
+    if not telemetry.remove(asset_id):
+        raise HTTPException(status_code=404, detail="Asset not streaming")
+
+    return {"asset_id": asset_id, "removed": True}
+
+
+# ─────────────────────────────────────
+# TIME-SERIES STORE
+# ─────────────────────────────────────
+
+@app.get("/assets")
+def list_assets():
+    return store.assets()
+
+
+@app.post("/assets/{asset_id}/samples")
+async def append_samples(asset_id: str, request: AppendSamplesRequest):
+
+    try:
+        total = await executors.run_async(store.append, asset_id, request.data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"asset_id": asset_id, "total_rows": total}
+
+
+@app.get("/assets/{asset_id}/window")
+def asset_window(asset_id: str, rows: Optional[int] = None):
+
+    try:
+        window = store.window(asset_id, rows)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "asset_id": asset_id,
+        "start": int(window.index.start),
+        "data": {c: np.nan_to_num(window[c].to_numpy()).tolist() for c in window.columns}
+    }
+
+
+@app.delete("/assets/{asset_id}")
+def drop_asset(asset_id: str):
+
+    if not store.drop(asset_id):
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    return {"asset_id": asset_id, "removed": True}
+
+
+# ─────────────────────────────────────
+# DATASETS
+# ─────────────────────────────────────
+
+@app.post("/datasets")
+async def ingest_dataset(file: UploadFile = File(...)):
+
+    try:
+        return await executors.run_async(
+            dataset_store.ingest_csv, file.file, file.filename or "dataset"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/datasets")
+def list_datasets():
+    return dataset_store.list()
+
+
+@app.get("/datasets/{dataset_id}")
+def get_dataset(dataset_id: str):
+
+    try:
+        return dataset_store.manifest(dataset_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+
+@app.delete("/datasets/{dataset_id}")
+def delete_dataset(dataset_id: str):
+
+    try:
+        dataset_store.delete(dataset_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+
+    return {"dataset_id": dataset_id, "removed": True}
 
 
 # ─────────────────────────────────────
@@ -320,13 +930,56 @@ async def explain(request: ExplainRequest):
 
     try:
 
-        from ai.explainer import generate_explanation
+        explanation = cached_explanation(request.health, request.anomalies, request.noise)
+
+        return {"explanation": explanation}
 
-        prompt = f"health:{int(request.health)} anomalies:{request.anomalies} noise:{int(request.noise)}"
+    except Exception as e:
 
-        explanation = generate_explanation(prompt)
+        import traceback
+        traceback.print_exc()
 
-        return {"explanation": explanation}
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/explain-batch")
+async def explain_batch(request: ExplainBatchRequest):
+
+    try:
+
+        from ai.explainer import explain_many
+
+        # same whole-point resolution (and negatives read as 0) as /explain,
+        # for every asset at once
+        values = np.maximum(np.array(
+            [(a.health, a.anomalies, a.noise) for a in request.assets], dtype=np.float64
+        ).reshape(-1, 3).astype(np.int64), 0)
+
+        explanations = await executors.run_async(
+            explain_many, values[:, 0], values[:, 1], values[:, 2]
+        )
+
+        return {"explanations": explanations}
+
+    except Exception as e:
+
+        import traceback
+        traceback.print_exc()
+
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/chat")
+async def chat(request: ChatRequest):
+
+    try:
+
+        response = await executors.run_async(
+            cached_chatbot_response,
+            request.query, request.health, request.anomalies, request.noise
+        )
+
+        return {"response": response}
 
     except Exception as e:
 
@@ -348,4 +1001,4 @@ if __name__ == "__main__":
         app,
         host="127.0.0.1",
         port=8000
-    )
\ No newline at end of file
+    )
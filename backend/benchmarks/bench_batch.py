@@ -0,0 +1,116 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SENSORS = ["temperature", "vibration", "pressure"]
+
+
+def make_asset(n, seed):
+
+    rng = np.random.default_rng(seed)
+
+    t = np.arange(n)
+
+    return {
+        "asset_id": f"machine-{seed}",
+        "data": {
+            "temperature": (50 + 5 * np.sin(t / 50) + rng.normal(0, 1, n)).tolist(),
+            "vibration": (30 + rng.normal(0, 3, n)).tolist(),
+            "pressure": (100 + rng.normal(0, 8, n)).tolist()
+        },
+        "sensors": SENSORS
+    }
+
+
+def as_records(asset):
+
+    # the row-record body /run-model expects
+    columns = [asset["data"][s] for s in SENSORS]
+
+    return [dict(zip(SENSORS, row)) for row in zip(*columns)]
+
+
+async def per_asset(client, assets, model, concurrency):
+
+    queue = asyncio.Queue()
+
+    for asset in assets:
+        queue.put_nowait(asset)
+
+    async def worker():
+        while not queue.empty():
+            asset = queue.get_nowait()
+            response = await client.post("/run-model", json={
+                "data": as_records(asset), "sensors": SENSORS, "model": model, "horizon": 10
+            })
+            response.raise_for_status()
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+
+async def batched(client, assets, model):
+
+    response = await client.post("/run-batch", json={
+        "assets": assets, "model": model, "horizon": 10
+    })
+    response.raise_for_status()
+
+
+async def main_async(args):
+
+    import api
+
+    transport = httpx.ASGITransport(app=api.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        await batched(client, [make_asset(args.rows, 999_999 - i) for i in range(2)], args.model)
+
+        print(f"{'assets':>8} {'per_asset/s':>12} {'batch/s':>10} {'speedup':>8}")
+
+        for level, n_assets in enumerate(int(a) for a in args.assets.split(",")):
+
+            # distinct data per run so the model cache never short-cuts a fit
+            assets = [make_asset(args.rows, level * 100_000 + i) for i in range(n_assets)]
+
+            start = time.perf_counter()
+            await per_asset(client, assets, args.model, args.concurrency)
+            single = time.perf_counter() - start
+
+            assets = [make_asset(args.rows, level * 100_000 + 50_000 + i) for i in range(n_assets)]
+
+            start = time.perf_counter()
+            await batched(client, assets, args.model)
+            batch = time.perf_counter() - start
+
+            print(
+                f"{n_assets:>8} "
+                f"{n_assets / single:>12.1f} "
+                f"{n_assets / batch:>10.1f} "
+                f"{single / batch:>7.1f}x"
+            )
+
+    api.executors.shutdown()
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", default="10,100,500")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--model", default="Linear Regression")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
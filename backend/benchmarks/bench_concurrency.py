@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_body(n, seed, model):
+
+    rng = np.random.default_rng(seed)
+
+    t = np.arange(n)
+
+    return {
+        "data": [
+            {"temperature": a, "vibration": b, "pressure": c}
+            for a, b, c in zip(
+                (50 + 5 * np.sin(t / 50) + rng.normal(0, 1, n)).tolist(),
+                (30 + rng.normal(0, 3, n)).tolist(),
+                (100 + rng.normal(0, 8, n)).tolist()
+            )
+        ],
+        "sensors": ["temperature", "vibration", "pressure"],
+        "model": model,
+        "horizon": 10
+    }
+
+
+async def run_level(client, bodies, concurrency):
+
+    latencies = []
+    queue = asyncio.Queue()
+
+    for body in bodies:
+        queue.put_nowait(body)
+
+    async def worker():
+        while not queue.empty():
+            body = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.post("/run-model", json=body)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    # a cheap endpoint polled alongside, to show whether the loop is blocked
+    async def ping():
+        pings = []
+        while not queue.empty():
+            start = time.perf_counter()
+            await client.get("/")
+            pings.append(time.perf_counter() - start)
+            await asyncio.sleep(0.05)
+        return pings
+
+    start = time.perf_counter()
+    results = await asyncio.gather(ping(), *[worker() for _ in range(concurrency)])
+    wall = time.perf_counter() - start
+
+    return np.array(latencies), np.array(results[0] or [0.0]), wall
+
+
+async def main_async(args):
+
+    import api
+
+    transport = httpx.ASGITransport(app=api.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+        # warm up the pools so the first level does not pay worker start-up
+        await client.post("/run-model", json=make_body(args.rows, 999_999, args.model))
+
+        print(f"{'clients':>8} {'p50_ms':>10} {'p99_ms':>10} {'req/s':>8} {'ping_p99_ms':>12}")
+
+        for level, concurrency in enumerate(int(c) for c in args.concurrency.split(",")):
+
+            # distinct data per request so the model cache never short-cuts a fit
+            bodies = [
+                make_body(args.rows, level * 10_000 + i, args.model)
+                for i in range(max(args.requests, concurrency))
+            ]
+
+            latencies, pings, wall = await run_level(client, bodies, concurrency)
+
+            print(
+                f"{concurrency:>8} "
+                f"{np.percentile(latencies, 50) * 1e3:>10.1f} "
+                f"{np.percentile(latencies, 99) * 1e3:>10.1f} "
+                f"{len(latencies) / wall:>8.2f} "
+                f"{np.percentile(pings, 99) * 1e3:>12.1f}"
+            )
+
+    api.executors.shutdown()
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--model", default="Random Forest")
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.explainer import analyze_risk, compute_confidence, compute_status, explain, explain_many, generate_explanation
+
+
+def legacy_extract_value(prompt, name):
+
+    # the previous implementation, kept here for comparison: the pattern is
+    # rebuilt (and looked up in re's cache) on every call
+    match = re.search(rf"{name}:(\d+)", prompt)
+
+    if match:
+        return int(match.group(1))
+
+    return 0
+
+
+def legacy_generate_explanation(prompt):
+
+    health = legacy_extract_value(prompt, "health")
+    anomalies = legacy_extract_value(prompt, "anomalies")
+    noise = legacy_extract_value(prompt, "noise")
+
+    status = compute_status(health)
+
+    risk = analyze_risk(anomalies, noise)
+
+    confidence = compute_confidence(health, anomalies, noise)
+
+    explanation = f"""
+System Health: {health}%
+Status: {status}
+Confidence Score: {confidence}%
+
+Operational Analysis:
+The hybrid digital twin evaluated sensor fusion outputs and predictive model results.
+
+Detected anomalies: {anomalies}
+Signal noise level: {noise}
+
+Risk Assessment:
+{risk}
+
+Recommendation:
+"""
+
+    if status == "Healthy":
+
+        explanation += "System functioning normally. Continue routine monitoring."
+
+    elif status == "Warning":
+
+        explanation += "Early signs of degradation detected. Schedule preventive inspection."
+
+    else:
+
+        explanation += "Critical condition detected. Immediate maintenance recommended."
+
+    return explanation
+
+
+def timed(fn, repeat):
+
+    best = np.inf
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    # the whole-point values /explain sends
+    health = rng.integers(0, 101, args.n)
+    anomalies = rng.integers(0, 30, args.n)
+    noise = rng.integers(0, 40, args.n)
+
+    rows = list(zip(health.tolist(), anomalies.tolist(), noise.tolist()))
+
+    def legacy_path():
+        # what /explain used to do: format a prompt, then parse it back
+        return [legacy_generate_explanation(f"health:{h} anomalies:{a} noise:{n}") for h, a, n in rows]
+
+    def prompt_path():
+        # the same round trip through the current adapter
+        return [generate_explanation(f"health:{h} anomalies:{a} noise:{n}") for h, a, n in rows]
+
+    def typed_path():
+        return [explain(h, a, n) for h, a, n in rows]
+
+    def vectorized_path():
+        return explain_many(health, anomalies, noise)
+
+    assert legacy_path() == prompt_path() == typed_path() == vectorized_path()
+
+    print(f"{args.n} explanations")
+    print(f"{'path':>26} {'ms':>10} {'us/call':>10}")
+
+    for name, fn in [
+        ("legacy re.search per call", legacy_path),
+        ("prompt adapter", prompt_path),
+        ("explain()", typed_path),
+        ("explain_many()", vectorized_path)
+    ]:
+        seconds = timed(fn, args.repeat)
+        print(f"{name:>26} {seconds * 1e3:>10.1f} {seconds / args.n * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fusion import FUSION_STRATEGIES, fuse_matrix
+
+
+def make_frame(rows, sensors, seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    # sensors on very different scales, sharing one underlying signal
+    common = np.sin(np.arange(rows) / 200)[:, None]
+    scale = 10 ** rng.uniform(-1, 3, sensors)
+
+    values = scale * (1 + 0.1 * common + rng.normal(0, 0.05, (rows, sensors)))
+
+    return pd.DataFrame(values, columns=[f"s{i}" for i in range(sensors)])
+
+
+def timed(fn, repeat):
+
+    best = np.inf
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--sensors", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.sensors)
+
+    matrix = np.ascontiguousarray(df.to_numpy(dtype=np.float64))
+    std = matrix.std(axis=0, dtype=np.float64)
+
+    print(f"{args.rows} rows x {args.sensors} sensors")
+    print(f"{'strategy':>18} {'ms':>10} {'Mcells/s':>10}")
+
+    cells = args.rows * args.sensors / 1e6
+
+    # the previous implementation, for reference
+    seconds = timed(lambda: df.mean(axis=1).values, args.repeat)
+    print(f"{'pandas mean':>18} {seconds * 1e3:>10.1f} {cells / seconds:>10.0f}")
+
+    for name in FUSION_STRATEGIES:
+        seconds = timed(lambda: fuse_matrix(matrix, name, std), args.repeat)
+        print(f"{name:>18} {seconds * 1e3:>10.1f} {cells / seconds:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.explainer import compute_status
+from ai.inference import MODEL_PATH, BatchGenerator, ExplainerModel, build_prompt
+
+
+def prompt(rng):
+
+    # the whole-point values and status /chat builds its prompt from
+    health = int(rng.integers(20, 101))
+
+    return build_prompt(health, int(rng.integers(0, 50)), int(rng.integers(0, 40)), compute_status(health))
+
+
+def run(generator, concurrency, requests):
+
+    # closed loop: every client sends its next prompt once the last returns
+    latencies = []
+    lock = threading.Lock()
+
+    def client(seed):
+
+        rng = np.random.default_rng(seed)
+
+        for _ in range(requests):
+            start = time.perf_counter()
+            generator.generate(prompt(rng))
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    tokens = generator.generated_tokens
+    start = time.perf_counter()
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    seconds = time.perf_counter() - start
+
+    return (generator.generated_tokens - tokens) / seconds, np.percentile(latencies, [50, 99])
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=4, help="prompts per client")
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--window-ms", type=float, default=10)
+    parser.add_argument("--max-length", type=int, default=200)
+    args = parser.parse_args()
+
+    holder = ExplainerModel(args.model_path).load()
+
+    # max_batch=1 is the old behaviour: one generate() per request, in turn
+    modes = {
+        "serial": BatchGenerator(holder, max_batch=1, window_ms=0, max_length=args.max_length),
+        "batched": BatchGenerator(holder, max_batch=args.max_batch, window_ms=args.window_ms, max_length=args.max_length),
+    }
+
+    for generator in modes.values():
+        generator.generate(prompt(np.random.default_rng(0)))
+
+    print(f"{'clients':>8} {'mode':>8} {'tokens/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'batch':>6}")
+
+    for concurrency in args.concurrency:
+        for name, generator in modes.items():
+
+            batches, prompts = generator.batches, generator.prompts
+
+            rate, (p50, p99) = run(generator, concurrency, args.requests)
+
+            mean_batch = (generator.prompts - prompts) / max(1, generator.batches - batches)
+
+            print(f"{concurrency:>8} {name:>8} {rate:>10.0f} {p50 * 1e3:>10.0f} {p99 * 1e3:>10.0f} {mean_batch:>6.1f}")
+
+    for generator in modes.values():
+        generator.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.lstm_model import fit_lstm, predict_lstm
+
+
+def make_signal(n, seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    t = np.arange(n)
+
+    return 50 + 5 * np.sin(t / 200) + rng.normal(0, 0.5, n)
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'train_s':>10} {'infer_s':>10} {'samples/s':>12} {'mae':>8}")
+
+    for n in [int(s) for s in args.sizes.split(",")]:
+
+        signal = make_signal(n)
+
+        start = time.perf_counter()
+        model = fit_lstm(signal)
+        train_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        predicted = predict_lstm(model, signal)
+        infer_s = time.perf_counter() - start
+
+        mae = np.abs(predicted - signal).mean()
+
+        print(f"{n:>10} {train_s:>10.2f} {infer_s:>10.2f} {n / infer_s:>12.0f} {mae:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import argparse
+import itertools
+import multiprocessing as mp
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from ai.explainer import compute_status, generate_explanation as rule_explanation
+from ai.inference import MMAP_WEIGHTS, MODEL_PATH, ExplainerModel, build_prompt, export_mmap_weights
+from ai.quantize import QUANT_WEIGHTS, export_quantized, quantize_int8
+
+
+def prompt_set():
+
+    # fixed grid covering every status and risk branch of the rule engine
+    return list(itertools.product([95, 85, 65, 45, 25], [0, 5, 15], [2, 12, 25]))
+
+
+def rss_mb():
+
+    try:
+        with open("/proc/self/status") as f:
+            return int(re.search(r"VmRSS:\s+(\d+)", f.read()).group(1)) / 1024
+    except OSError:
+        return float("nan")
+
+
+def words(text):
+
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def rouge1(candidate, reference):
+
+    candidate, reference = words(candidate), words(reference)
+
+    if not candidate or not reference:
+        return 0.0
+
+    overlap = sum(min(candidate.count(w), reference.count(w)) for w in set(candidate))
+
+    if overlap == 0:
+        return 0.0
+
+    precision, recall = overlap / len(candidate), overlap / len(reference)
+
+    return 2 * precision * recall / (precision + recall)
+
+
+def measure(path, quantize, new_tokens, batch):
+
+    # runs in a fresh process so load time and memory are not shared
+    before = rss_mb()
+
+    start = time.perf_counter()
+    holder = ExplainerModel(path, quantize).load()
+    load_seconds = time.perf_counter() - start
+
+    loaded = rss_mb() - before
+
+    tokenizer, model = holder.tokenizer, holder.model
+    tokenizer.padding_side = "left"
+
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+
+    prompts = [build_prompt(h, a, n, compute_status(h)) for h, a, n in prompt_set()]
+
+    def generate(chunk):
+
+        inputs = tokenizer(chunk, return_tensors="pt", padding=True)
+
+        # greedy and a fixed length, so both modes do identical work
+        with torch.inference_mode():
+            output = model.generate(
+                **inputs,
+                max_new_tokens=new_tokens,
+                min_new_tokens=new_tokens,
+                do_sample=False,
+                pad_token_id=tokenizer.pad_token_id
+            )
+
+        return tokenizer.batch_decode(output, skip_special_tokens=True)
+
+    generate(prompts[:1])
+
+    rates = {}
+
+    for size in (1, batch):
+        start = time.perf_counter()
+        generate(prompts[:size])
+        rates[size] = size * new_tokens / (time.perf_counter() - start)
+
+    texts = []
+
+    for i in range(0, len(prompts), batch):
+        texts += [t.split("Explanation:")[-1].strip() for t in generate(prompts[i:i + batch])]
+
+    # mmap'd fp32 pages only count once generation has touched them
+    return {
+        "load_seconds": load_seconds,
+        "loaded_mb": loaded,
+        "serving_mb": rss_mb() - before,
+        "rates": rates,
+        "texts": texts
+    }
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-path", default=MODEL_PATH)
+    parser.add_argument("--new-tokens", type=int, default=64)
+    parser.add_argument("--batch", type=int, default=8)
+    args = parser.parse_args()
+
+    # both exports exist up front, so load time is the steady-state path
+    from transformers import AutoModelForCausalLM
+
+    export_mmap_weights(AutoModelForCausalLM.from_pretrained(args.model_path), args.model_path)
+    export_quantized(quantize_int8(AutoModelForCausalLM.from_pretrained(args.model_path)), args.model_path)
+
+    ctx = mp.get_context("spawn")
+
+    results = {}
+
+    for mode in ("none", "int8"):
+        with ctx.Pool(1) as pool:
+            results[mode] = pool.apply(measure, (args.model_path, mode, args.new_tokens, args.batch))
+
+    sizes = {
+        "none": os.path.getsize(os.path.join(args.model_path, MMAP_WEIGHTS)),
+        "int8": os.path.getsize(os.path.join(args.model_path, QUANT_WEIGHTS)),
+    }
+
+    references = [
+        rule_explanation(f"health:{h} anomalies:{a} noise:{n}") for h, a, n in prompt_set()
+    ]
+
+    print(f"{'mode':>6} {'load s':>8} {'weights MB':>11} {'RSS load':>9} {'RSS run':>8} "
+          f"{'tok/s b=1':>10} {f'tok/s b={args.batch}':>10} {'status':>7} {'rouge1':>7}")
+
+    for mode, r in results.items():
+
+        # does the text name the rule engine's status, and how much of the
+        # rule-based explanation's wording does it share
+        status = sum(
+            compute_status(h).lower() in text.lower()
+            for (h, _, _), text in zip(prompt_set(), r["texts"])
+        ) / len(references)
+
+        rouge = sum(rouge1(t, ref) for t, ref in zip(r["texts"], references)) / len(references)
+
+        print(f"{'fp32' if mode == 'none' else mode:>6} {r['load_seconds']:>8.2f} {sizes[mode] / 1e6:>11.1f} "
+              f"{r['loaded_mb']:>9.0f} {r['serving_mb']:>8.0f} {r['rates'][1]:>10.1f} {r['rates'][args.batch]:>10.1f} "
+              f"{status:>7.0%} {rouge:>7.3f}")
+
+    # how far int8 drifts from fp32 on the same greedy decode
+    same = sum(a == b for a, b in zip(results["none"]["texts"], results["int8"]["texts"]))
+    drift = sum(rouge1(a, b) for a, b in zip(results["int8"]["texts"], results["none"]["texts"]))
+
+    print(f"int8 vs fp32: {same}/{len(references)} identical, rouge1 {drift / len(references):.3f}")
+
+
+if __name__ == "__main__":
+    main()
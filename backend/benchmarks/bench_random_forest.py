@@ -0,0 +1,90 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.random_forest import (
+    fit_random_forest,
+    predict_random_forest,
+    forecast_random_forest
+)
+
+
+def legacy_random_forest(signal):
+
+    # the previous time-index implementation, kept here for comparison
+    X = np.arange(len(signal)).reshape(-1, 1)
+
+    model = RandomForestRegressor(
+        n_estimators=100,
+        random_state=42
+    )
+
+    start = time.perf_counter()
+    model.fit(X, signal)
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.predict(X)
+    predict_s = time.perf_counter() - start
+
+    return fit_s, predict_s
+
+
+def lag_random_forest(signal, horizon):
+
+    start = time.perf_counter()
+    model = fit_random_forest(signal)
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predict_random_forest(model, signal)
+    forecast_random_forest(model, signal, horizon)
+    predict_s = time.perf_counter() - start
+
+    return fit_s, predict_s
+
+
+def make_signal(n, seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    t = np.arange(n)
+
+    return 50 + 5 * np.sin(t / 200) + rng.normal(0, 0.5, n)
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--horizon", type=int, default=10)
+    parser.add_argument(
+        "--legacy-max",
+        type=int,
+        default=100_000,
+        help="skip the legacy model above this many rows"
+    )
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'impl':>8} {'fit_s':>10} {'predict_s':>10}")
+
+    for n in [int(s) for s in args.sizes.split(",")]:
+
+        signal = make_signal(n)
+
+        if n <= args.legacy_max:
+            fit_s, predict_s = legacy_random_forest(signal)
+            print(f"{n:>10} {'legacy':>8} {fit_s:>10.3f} {predict_s:>10.3f}")
+
+        fit_s, predict_s = lag_random_forest(signal, args.horizon)
+        print(f"{n:>10} {'lag':>8} {fit_s:>10.3f} {predict_s:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.serialization import encode_arrays, decode_arrays
+
+
+def make_result(n, seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    actual = 50 + rng.normal(0, 5, n)
+
+    return {
+        "actual": actual,
+        "predicted": actual + rng.normal(0, 0.5, n),
+        "future": np.full(10, actual[-1]),
+        "anomalies": np.flatnonzero(rng.random(n) < 0.01),
+        "health": 87.5,
+        "noise": 4.2
+    }
+
+
+def encode_json(result):
+
+    # mirrors the default /run-model response path
+    return json.dumps({
+        "actual": np.nan_to_num(result["actual"]).tolist(),
+        "predicted": np.nan_to_num(result["predicted"]).tolist(),
+        "future": np.nan_to_num(result["future"]).tolist(),
+        "anomalies": result["anomalies"].tolist(),
+        "health": result["health"],
+        "noise": result["noise"],
+        "sensors_used": ["temperature", "vibration", "pressure"]
+    }).encode()
+
+
+def encode_binary(result):
+
+    chunks = encode_arrays(
+        {
+            "actual": np.nan_to_num(result["actual"]).astype("<f4"),
+            "predicted": np.nan_to_num(result["predicted"]).astype("<f4"),
+            "future": np.nan_to_num(result["future"]).astype("<f4"),
+            "anomalies": result["anomalies"].astype("<i4")
+        },
+        {
+            "health": result["health"],
+            "noise": result["noise"],
+            "sensors_used": ["temperature", "vibration", "pressure"]
+        }
+    )
+
+    return chunks, sum(len(c) for c in chunks)
+
+
+def timed(fn, repeat):
+
+    best = float("inf")
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+
+    return best, out
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'points':>10} {'format':>8} {'encode_ms':>10} {'decode_ms':>10} {'bytes':>12}")
+
+    for n in [int(s) for s in args.sizes.split(",")]:
+
+        result = make_result(n)
+
+        encode_s, payload = timed(lambda: encode_json(result), args.repeat)
+        decode_s, _ = timed(lambda: json.loads(payload), args.repeat)
+        print(f"{n:>10} {'json':>8} {encode_s * 1e3:>10.2f} {decode_s * 1e3:>10.2f} {len(payload):>12}")
+
+        encode_s, (chunks, size) = timed(lambda: encode_binary(result), args.repeat)
+        payload = b"".join(bytes(c) for c in chunks)
+        decode_s, _ = timed(lambda: decode_arrays(payload), args.repeat)
+        print(f"{n:>10} {'binary':>8} {encode_s * 1e3:>10.2f} {decode_s * 1e3:>10.2f} {size:>12}")
+
+
+if __name__ == "__main__":
+    main()
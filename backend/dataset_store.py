@@ -0,0 +1,282 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+import weakref
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from utils.ingest import inspect_csv, iter_sensor_chunks
+
+DATASET_DIR = os.environ.get("DATASET_DIR", "data/datasets")
+
+# retention: once either limit is exceeded the least recently opened
+# datasets that no frame still references are removed
+DATASET_MAX_COUNT = int(os.environ.get("DATASET_MAX_COUNT", 50))
+DATASET_MAX_BYTES = int(os.environ.get("DATASET_MAX_BYTES", 2 * 1024 ** 3))
+
+DTYPE = "<f8"
+
+HASH_CHUNK = 1 << 20
+
+
+def _slug(text):
+
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-")[:40] or "dataset"
+
+
+def _content_hash(file):
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    file.seek(0)
+
+    for chunk in iter(lambda: file.read(HASH_CHUNK), b""):
+        digest.update(chunk)
+
+    file.seek(0)
+
+    return digest.hexdigest()
+
+
+def _nbytes(manifest):
+
+    return manifest["rows"] * np.dtype(manifest["dtype"]).itemsize * len(manifest["columns"])
+
+
+class DatasetStore:
+
+    # root/<dataset_id>/manifest.json   name, rows, columns
+    #                   <n>.f8          one raw little-endian float64 file
+    #                                   per numeric column
+    #
+    # a CSV is parsed once; reads memory-map only the requested columns.
+    # Raw column files rather than Parquet: a mapped column needs no decoder
+    # and costs nothing to open. Identical uploads share one dataset.
+
+    def __init__(self, root=DATASET_DIR, max_count=DATASET_MAX_COUNT, max_bytes=DATASET_MAX_BYTES):
+
+        self.root = root
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+
+        # frames handed out by open() that are still alive, per dataset
+        self._refs = Counter()
+        self._lock = threading.Lock()
+
+    def _dir(self, dataset_id):
+
+        if not re.fullmatch(r"[a-z0-9-]+", dataset_id):
+            raise KeyError(dataset_id)
+
+        return os.path.join(self.root, dataset_id)
+
+    def _manifest_path(self, dataset_id):
+
+        return os.path.join(self._dir(dataset_id), "manifest.json")
+
+    def _touch(self, dataset_id):
+
+        # the manifest's mtime records the last open, so eviction order
+        # survives a restart
+        try:
+            os.utime(self._manifest_path(dataset_id))
+        except FileNotFoundError:
+            pass
+
+    def _last_opened(self, dataset_id):
+
+        try:
+            return os.path.getmtime(self._manifest_path(dataset_id))
+        except FileNotFoundError:
+            return 0.0
+
+    def _release(self, dataset_id):
+
+        with self._lock:
+            self._refs[dataset_id] -= 1
+            if self._refs[dataset_id] <= 0:
+                del self._refs[dataset_id]
+
+    def find(self, content_hash):
+
+        for manifest in self.list():
+            if manifest.get("content_hash") == content_hash:
+                return manifest
+
+        return None
+
+    def ingest_csv(self, file, name="dataset"):
+
+        content_hash = _content_hash(file)
+
+        existing = self.find(content_hash)
+
+        if existing is not None:
+            self._touch(existing["dataset_id"])
+            return existing
+
+        head, raw_names = inspect_csv(file)
+
+        columns = head.select_dtypes(include=np.number).columns.tolist()
+
+        if len(columns) == 0:
+            raise ValueError("CSV must contain numeric sensor columns.")
+
+        dataset_id = f"{_slug(os.path.splitext(name)[0])}-{uuid.uuid4().hex[:8]}"
+
+        path = self._dir(dataset_id)
+        os.makedirs(path)
+
+        rows = 0
+
+        try:
+            handles = [open(os.path.join(path, f"{j}.f8"), "wb") for j in range(len(columns))]
+
+            try:
+                for block in iter_sensor_chunks(file, raw_names, columns):
+
+                    block[~np.isfinite(block)] = np.nan
+
+                    # column-major on disk: one sequential append per column
+                    for j, handle in enumerate(handles):
+                        handle.write(np.ascontiguousarray(block[:, j], dtype=DTYPE).tobytes())
+
+                    rows += len(block)
+            finally:
+                for handle in handles:
+                    handle.close()
+
+        except Exception:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+        manifest = {
+            "dataset_id": dataset_id,
+            "name": name,
+            "rows": rows,
+            "dtype": DTYPE,
+            "columns": [{"name": c, "file": f"{j}.f8"} for j, c in enumerate(columns)],
+            "content_hash": content_hash,
+            "created": time.time()
+        }
+
+        # manifest last: a dataset is only listed once its columns are complete
+        with open(os.path.join(path, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        self._enforce_limits(keep=dataset_id)
+
+        return manifest
+
+    def _enforce_limits(self, keep):
+
+        manifests = sorted(self.list(), key=lambda m: self._last_opened(m["dataset_id"]))
+
+        count, size = len(manifests), sum(_nbytes(m) for m in manifests)
+
+        for manifest in manifests:
+
+            if count <= self.max_count and size <= self.max_bytes:
+                return
+
+            with self._lock:
+                # a run or job still holds a frame of it
+                if manifest["dataset_id"] == keep or self._refs[manifest["dataset_id"]] > 0:
+                    continue
+
+                shutil.rmtree(self._dir(manifest["dataset_id"]), ignore_errors=True)
+
+            count, size = count - 1, size - _nbytes(manifest)
+
+    def manifest(self, dataset_id):
+
+        path = self._manifest_path(dataset_id)
+
+        if not os.path.exists(path):
+            raise KeyError(dataset_id)
+
+        with open(path) as f:
+            return json.load(f)
+
+    def column(self, dataset_id, name, manifest=None):
+
+        manifest = manifest or self.manifest(dataset_id)
+
+        for column in manifest["columns"]:
+            if column["name"] == name:
+                if manifest["rows"] == 0:
+                    return np.empty(0, dtype=manifest["dtype"])
+                return np.memmap(
+                    os.path.join(self._dir(dataset_id), column["file"]),
+                    dtype=manifest["dtype"], mode="r", shape=(manifest["rows"],)
+                )
+
+        raise KeyError(name)
+
+    def open(self, dataset_id, sensors=None, rows=None):
+
+        # frame of the selected columns (all when sensors is empty),
+        # optionally only the last rows; other columns are never touched.
+        # The dataset is not evicted while the frame is alive.
+        with self._lock:
+            manifest = self.manifest(dataset_id)
+            self._refs[dataset_id] += 1
+
+        try:
+            names = [c["name"] for c in manifest["columns"]]
+
+            selected = names
+
+            if sensors:
+
+                selected = [s for s in (s.strip().lower() for s in sensors) if s in names]
+
+                if not selected:
+                    raise ValueError(f"None of the sensors {list(sensors)} are in the dataset. Available: {names}")
+
+            start = max(0, manifest["rows"] - rows) if rows else 0
+
+            frame = pd.DataFrame(
+                {s: self.column(dataset_id, s, manifest)[start:] for s in selected},
+                index=pd.RangeIndex(start, manifest["rows"])
+            )
+        except Exception:
+            self._release(dataset_id)
+            raise
+
+        weakref.finalize(frame, self._release, dataset_id)
+
+        self._touch(dataset_id)
+
+        return frame
+
+    def list(self):
+
+        if not os.path.isdir(self.root):
+            return []
+
+        manifests = []
+
+        for dataset_id in sorted(os.listdir(self.root)):
+            try:
+                manifests.append(self.manifest(dataset_id))
+            except KeyError:
+                continue
+
+        return manifests
+
+    def delete(self, dataset_id):
+
+        self.manifest(dataset_id)
+
+        shutil.rmtree(self._dir(dataset_id))
+
+
+dataset_store = DatasetStore()
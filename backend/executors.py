@@ -0,0 +1,124 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+CPU_COUNT = os.cpu_count() or 1
+
+EXECUTOR_THREADS = int(os.environ.get("EXECUTOR_THREADS", min(32, CPU_COUNT + 4)))
+EXECUTOR_PROCESSES = int(os.environ.get("EXECUTOR_PROCESSES", CPU_COUNT))
+
+
+# ─────────────────────────────────────
+# SHARED MEMORY TRANSFER
+# ─────────────────────────────────────
+
+def _call_shared(fn, handle, args):
+
+    # runs in the worker: map the parent's block instead of unpickling a copy
+    name, shape, dtype = handle
+
+    # spawned workers share the parent's resource tracker, so the parent's
+    # unlink is the only cleanup needed
+    shm = SharedMemory(name=name)
+
+    array = None
+
+    try:
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        array.flags.writeable = False
+        return fn(array, *args)
+    finally:
+        del array
+        shm.close()
+
+
+class Executors:
+
+    # thread pool for request handling and NumPy/torch work that releases the
+    # GIL, process pool for GIL-bound tree fits
+
+    def __init__(self, threads=EXECUTOR_THREADS, processes=EXECUTOR_PROCESSES):
+
+        self.threads = threads
+        self.processes = processes
+
+        self._thread_pool = None
+        self._process_pool = None
+        self._lock = threading.Lock()
+
+    def thread_pool(self):
+
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=self.threads,
+                    thread_name_prefix="pipeline"
+                )
+            return self._thread_pool
+
+    def process_pool(self):
+
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._process_pool
+
+    async def run_async(self, fn, *args, **kwargs):
+
+        # keep the event loop free while fn runs on the thread pool
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(self.thread_pool(), lambda: fn(*args, **kwargs))
+
+    def run_process(self, fn, array, *args):
+
+        # fn(array, *args) in a worker process; the array travels through a
+        # shared memory block, only the block name is pickled
+        if self.processes <= 0:
+            return fn(array, *args)
+
+        array = np.ascontiguousarray(array)
+
+        shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+
+        try:
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+
+            handle = (shm.name, array.shape, array.dtype.str)
+
+            try:
+                future = self.process_pool().submit(_call_shared, fn, handle, args)
+            except BrokenProcessPool:
+                self._reset_process_pool()
+                future = self.process_pool().submit(_call_shared, fn, handle, args)
+
+            return future.result()
+
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def _reset_process_pool(self):
+
+        with self._lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False, cancel_futures=True)
+                self._process_pool = None
+
+    def shutdown(self):
+
+        self._reset_process_pool()
+
+        with self._lock:
+            if self._thread_pool is not None:
+                self._thread_pool.shutdown(wait=False)
+                self._thread_pool = None
@@ -0,0 +1,286 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from models.registry import model_registry
+from pipeline import Pipeline, frame_from_records
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+JOB_TTL_SECONDS = float(os.environ.get("JOB_TTL_SECONDS", 3600))
+
+# stages reported by a worker, in order, used to derive progress
+JOB_STAGES = ["parse", "data_quality", "fusion", "fit", "predict", "anomaly"]
+
+
+# ─────────────────────────────────────
+# WORKER PROCESS
+# ─────────────────────────────────────
+
+_progress = None
+_current_job = None
+_current_cancel = None
+_worker_pipeline = None
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def _init_worker(progress_queue):
+
+    global _progress, _worker_pipeline
+
+    _progress = progress_queue
+
+    # JOB_WORKERS of these share the machine, so fits stay on one core
+    _worker_pipeline = Pipeline(in_worker=True)
+    _worker_pipeline.add_hook(_report_stage)
+
+
+def _report_stage(stage, seconds):
+
+    if stage in JOB_STAGES:
+        _progress.put((_current_job, stage))
+
+    # stage boundaries are where a cancelled job stops, freeing its worker
+    if _current_cancel is not None and _current_cancel.is_set():
+        raise JobCancelled(_current_job)
+
+
+def _run_job(job_id, cancel, records, sensors, model, horizon, options):
+
+    # options: the /run-model extras, {"scoring", "fusion", "model_id", "timings"}
+    global _current_job, _current_cancel
+
+    _current_job = job_id
+    _current_cancel = cancel
+
+    if cancel.is_set():
+        raise JobCancelled(job_id)
+
+    timings = {} if options.get("timings") else None
+
+    fitted, fusion, trained = None, options.get("fusion", "mean"), None
+
+    if options.get("model_id"):
+        # score on the signal the stored model was trained on
+        meta, fitted = model_registry.load(options["model_id"])
+        model, fusion, trained = meta["model"], meta.get("fusion", "mean"), meta["sensors"]
+
+    with _worker_pipeline.stage("parse", timings):
+        numeric_df, sensors = frame_from_records(records, trained or sensors)
+
+    if trained is not None:
+
+        missing = [s for s in trained if s not in sensors]
+
+        if missing:
+            raise ValueError(f"Data is missing sensors the model was trained on: {missing}")
+
+    result = _worker_pipeline.run(
+        numeric_df, sensors, model, horizon, timings=timings, fitted=fitted,
+        scoring=options.get("scoring", "fused"), fusion=fusion
+    )
+
+    result["sensors_used"] = sensors
+
+    if timings is not None:
+        result["timings"] = timings
+
+    return result
+
+
+# ─────────────────────────────────────
+# JOB MANAGER
+# ─────────────────────────────────────
+
+class Job:
+
+    def __init__(self, job_id):
+
+        self.id = job_id
+        self.status = "queued"
+        self.stage = None
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.future = None
+        self.cancel_event = None
+
+    def to_dict(self):
+
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "error": self.error,
+            "created": self.created,
+            "finished": self.finished
+        }
+
+
+class JobManager:
+
+    def __init__(self, max_workers=JOB_WORKERS, ttl=JOB_TTL_SECONDS):
+
+        self.max_workers = max_workers
+        self.ttl = ttl
+
+        self._jobs = {}
+        # re-entrant: a successful cancel() runs the done callback inline
+        self._lock = threading.RLock()
+        self._executor = None
+        self._progress = None
+        self._manager = None
+
+    def _pool(self):
+
+        # started on first submit so importing the API never forks workers
+        ctx = multiprocessing.get_context("spawn")
+
+        if self._manager is None:
+
+            self._progress = ctx.Queue()
+
+            # per-job cancel flags the workers can see
+            self._manager = ctx.Manager()
+
+        if self._executor is None:
+
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(self._progress,)
+            )
+
+        return self._executor
+
+    def _drain_progress(self):
+
+        if self._progress is None:
+            return
+
+        while True:
+
+            try:
+                job_id, stage = self._progress.get_nowait()
+            except queue.Empty:
+                return
+
+            job = self._jobs.get(job_id)
+
+            if job is not None and job.status in ("queued", "running"):
+                job.status = "running"
+                job.stage = stage
+                job.progress = (JOB_STAGES.index(stage) + 1) / (len(JOB_STAGES) + 1)
+
+    def _evict(self):
+
+        now = time.time()
+
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished is not None and now - job.finished > self.ttl
+        ]
+
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _on_done(self, job, future):
+
+        with self._lock:
+
+            job.finished = time.time()
+
+            if job.status == "cancelled" or future.cancelled():
+                job.status = "cancelled"
+                return
+
+            error = future.exception()
+
+            if error is not None:
+                job.status = "failed"
+                job.error = str(error)
+            else:
+                job.status = "done"
+                job.progress = 1.0
+                job.result = future.result()
+
+    def submit(self, records, sensors, model, horizon, options=None):
+
+        job = Job(uuid.uuid4().hex)
+        options = options or {}
+
+        with self._lock:
+            self._evict()
+            self._jobs[job.id] = job
+
+        try:
+            self._submit(job, records, sensors, model, horizon, options)
+        except BrokenProcessPool:
+            # a worker died (e.g. OOM killed); start a fresh pool once. The
+            # manager stays, other jobs' cancel events still point at it
+            self._shutdown_executor()
+            self._submit(job, records, sensors, model, horizon, options)
+
+        job.future.add_done_callback(lambda f: self._on_done(job, f))
+
+        return job
+
+    def _submit(self, job, records, sensors, model, horizon, options):
+
+        pool = self._pool()
+
+        job.cancel_event = self._manager.Event()
+        job.future = pool.submit(
+            _run_job, job.id, job.cancel_event, records, sensors, model, horizon, options
+        )
+
+    def get(self, job_id):
+
+        with self._lock:
+            self._drain_progress()
+            self._evict()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+
+        with self._lock:
+
+            job = self._jobs.get(job_id)
+
+            if job is None or job.status in ("done", "failed", "cancelled"):
+                return job
+
+            # queued jobs never start; a running job raises JobCancelled at
+            # its next stage boundary and its worker takes the next job
+            if not job.future.cancel():
+                job.cancel_event.set()
+
+            job.status = "cancelled"
+            job.finished = time.time()
+
+            return job
+
+    def _shutdown_executor(self):
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def shutdown(self):
+
+        self._shutdown_executor()
+
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
@@ -1,10 +1,283 @@
+import json
+import os
+import threading
+
 import numpy as np
+import torch
+from torch import nn
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.preprocessing import MinMaxScaler
+
+WINDOW = 32
+LATENT = 8
+HIDDEN = 32
+BATCH_SIZE = 512
+MAX_EPOCHS = 30
+PATIENCE = 3
+LEARNING_RATE = 3e-3
+MAX_WINDOWS_PER_EPOCH = 20_000
+VALIDATION_FRACTION = 0.1
+INFERENCE_BATCH = 16_384
+HEALTHY_Z = 3.0
+
+# optional pretrained model (see save_autoencoder) used instead of fitting
+MODEL_PATH = os.environ.get("AUTOENCODER_MODEL_PATH")
+
+
+class AutoencoderNet(nn.Module):
+
+    def __init__(self, window, hidden=HIDDEN, latent=LATENT):
+
+        super().__init__()
+
+        # constructor arguments, so a saved state_dict can be rebuilt
+        self.config = {"window": window, "hidden": hidden, "latent": latent}
+
+        self.encoder = nn.Sequential(
+            nn.Linear(window, hidden), nn.ReLU(), nn.Linear(hidden, latent)
+        )
+        self.decoder = nn.Sequential(
+            nn.Linear(latent, hidden), nn.ReLU(), nn.Linear(hidden, window)
+        )
+
+    def forward(self, x):
+
+        return self.decoder(self.encoder(x))
+
+
+class AutoencoderModel:
+
+    # fitted network plus the scaler and window it was trained with
+
+    def __init__(self, net, scaler, window):
+
+        self.net = net
+        self.scaler = scaler
+        self.window = window
+
+
+def _scale(scaler, signal):
+
+    return scaler.transform(signal.reshape(-1, 1)).ravel().astype(np.float32)
+
+
+def _healthy_windows(signal, window):
+
+    # a window is healthy when none of its samples is a robust-z outlier;
+    # counted with a cumulative sum instead of scanning every window
+    median = np.median(signal)
+    mad = np.median(np.abs(signal - median)) * 1.4826 or 1.0
+
+    bad = (np.abs(signal - median) / mad > HEALTHY_Z).astype(np.int64)
+
+    counts = np.concatenate([[0], np.cumsum(bad)])
+
+    return np.flatnonzero(counts[window:] - counts[:-window] == 0)
+
+
+def _batch(windows, index):
+
+    return torch.from_numpy(np.ascontiguousarray(windows[index]))
+
+
+def fit_autoencoder(signal, scaler=None):
+
+    signal = np.asarray(signal, dtype=np.float64)
+
+    if len(signal) < 2:
+        raise ValueError("Autoencoder needs at least 2 samples.")
+
+    scaler = scaler if scaler is not None else MinMaxScaler()
+    scaler.fit(signal.reshape(-1, 1))
+
+    window = max(1, min(WINDOW, len(signal) // 2))
+
+    windows = sliding_window_view(_scale(scaler, signal), window)
+
+    healthy = _healthy_windows(signal, window)
+
+    if len(healthy) == 0:
+        healthy = np.arange(len(windows))
+
+    n_val = int(len(healthy) * VALIDATION_FRACTION)
+    train, val = healthy[:len(healthy) - n_val], healthy[len(healthy) - n_val:]
+
+    torch.manual_seed(42)
+    rng = np.random.default_rng(42)
+
+    net = AutoencoderNet(window)
+    optimizer = torch.optim.Adam(net.parameters(), lr=LEARNING_RATE)
+    loss_fn = nn.MSELoss()
+
+    best_loss = np.inf
+    best_state = None
+    stale = 0
+
+    for epoch in range(MAX_EPOCHS):
+
+        net.train()
+
+        order = rng.permutation(train)[:MAX_WINDOWS_PER_EPOCH]
+
+        for start in range(0, len(order), BATCH_SIZE):
+
+            batch = _batch(windows, order[start:start + BATCH_SIZE])
+
+            optimizer.zero_grad()
+            loss = loss_fn(net(batch), batch)
+            loss.backward()
+            optimizer.step()
+
+        if n_val == 0:
+            continue
+
+        net.eval()
+
+        with torch.inference_mode():
+            batch = _batch(windows, val[-MAX_WINDOWS_PER_EPOCH:])
+            val_loss = loss_fn(net(batch), batch).item()
+
+        if val_loss < best_loss:
+            best_loss = val_loss
+            best_state = {k: v.clone() for k, v in net.state_dict().items()}
+            stale = 0
+        else:
+            stale += 1
+            if stale >= PATIENCE:
+                break
+
+    if best_state is not None:
+        net.load_state_dict(best_state)
+
+    net.eval()
+
+    return AutoencoderModel(net, scaler, window)
+
+
+def _overlap_add(model, scaled, per_window):
+
+    # runs the net over every overlapping window in large batches and folds
+    # per_window(batch, reconstruction) back onto samples: each sample gets
+    # the mean over all windows that cover it
+    window = model.window
+
+    windows = sliding_window_view(scaled, window)
+
+    total = np.zeros(len(scaled), dtype=np.float64)
+
+    with torch.inference_mode():
+        for start in range(0, len(windows), INFERENCE_BATCH):
+
+            batch = _batch(windows, slice(start, start + INFERENCE_BATCH))
+            values = per_window(batch.numpy(), model.net(batch).numpy())
+
+            # one vectorized add per window offset, not per sample
+            stop = start + len(values)
+            for k in range(window):
+                total[start + k:stop + k] += values[:, k]
+
+    i = np.arange(len(scaled))
+    coverage = np.minimum(i, len(windows) - 1) - np.maximum(0, i - window + 1) + 1
+
+    return total / coverage
+
+
+def predict_autoencoder(model, signal):
+
+    signal = np.asarray(signal, dtype=np.float64)
+
+    reconstructed = _overlap_add(
+        model, _scale(model.scaler, signal), lambda x, r: r
+    )
+
+    return model.scaler.inverse_transform(reconstructed.reshape(-1, 1)).ravel()
+
+
+def reconstruction_error(model, signal):
+
+    # per-sample mean absolute reconstruction error in scaled units
+    signal = np.asarray(signal, dtype=np.float64)
+
+    return _overlap_add(
+        model, _scale(model.scaler, signal), lambda x, r: np.abs(x - r)
+    )
+
+
+def save_autoencoder(model, path):
+
+    os.makedirs(path, exist_ok=True)
+
+    torch.save(model.net.state_dict(), os.path.join(path, "weights.pt"))
+
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({
+            "window": model.window,
+            "hidden": HIDDEN,
+            "latent": LATENT,
+            "data_min": float(model.scaler.data_min_[0]),
+            "data_max": float(model.scaler.data_max_[0])
+        }, f, indent=2)
+
+
+def load_autoencoder(path):
+
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+
+    net = AutoencoderNet(meta["window"], meta["hidden"], meta["latent"])
+    net.load_state_dict(torch.load(os.path.join(path, "weights.pt"), weights_only=True))
+    net.eval()
+
+    scaler = MinMaxScaler()
+    scaler.fit(np.array([[meta["data_min"]], [meta["data_max"]]]))
+
+    return AutoencoderModel(net, scaler, meta["window"])
+
+
+_pretrained = None
+_pretrained_lock = threading.Lock()
+
+
+def load_or_fit_autoencoder(signal):
+
+    global _pretrained
+
+    if MODEL_PATH and os.path.exists(os.path.join(MODEL_PATH, "meta.json")):
+
+        if _pretrained is not None:
+            return _pretrained
+
+        # executor threads race here on the first requests; load once
+        with _pretrained_lock:
+            if _pretrained is None:
+                _pretrained = load_autoencoder(MODEL_PATH)
+
+        return _pretrained
+
+    return fit_autoencoder(signal)
+
 
 def run_autoencoder(signal, scaler):
 
     signal = np.array(signal)
 
-    # simulate reconstruction
-    reconstructed = signal + np.random.normal(0, 0.05, len(signal))
+    model = fit_autoencoder(signal, scaler)
+
+    reconstructed = predict_autoencoder(model, signal)
+
+    return signal, reconstructed
+
+
+if __name__ == "__main__":
+
+    # python models/autoencoder.py healthy.csv temperature,vibration out_dir
+    import sys
+    import pandas as pd
+
+    csv_path, sensors, out_dir = sys.argv[1], sys.argv[2].split(","), sys.argv[3]
+
+    signal = pd.read_csv(csv_path, usecols=sensors)[sensors].mean(axis=1).to_numpy()
+
+    save_autoencoder(fit_autoencoder(signal), out_dir)
 
-    return signal, reconstructed
\ No newline at end of file
+    print("Autoencoder saved to:", out_dir)
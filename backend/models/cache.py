@@ -0,0 +1,219 @@
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 1024 * 1024 * 1024
+
+# bytes per node of a fitted sklearn tree (the Node struct)
+TREE_NODE_BYTES = 64
+
+
+def fingerprint(signal, sensors, model_name):
+
+    signal = np.ascontiguousarray(signal, dtype=np.float64)
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    digest.update(model_name.encode())
+    digest.update(b"\0")
+    digest.update(",".join(sensors).encode())
+    digest.update(b"\0")
+    digest.update(signal.data)
+
+    return digest.hexdigest()
+
+
+def estimate_nbytes(value, _seen=None):
+
+    # approximate in-memory size of a fitted model from its arrays, tensors
+    # and tree nodes, without serializing it
+    seen = _seen if _seen is not None else set()
+
+    if id(value) in seen:
+        return 0
+
+    seen.add(id(value))
+
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+
+    if hasattr(value, "node_count") and hasattr(value, "value"):
+        # sklearn Tree: node structs plus the per-node value array
+        return value.node_count * TREE_NODE_BYTES + value.value.nbytes
+
+    if hasattr(value, "state_dict") and callable(value.state_dict):
+        # torch module
+        return sum(t.nelement() * t.element_size() for t in value.state_dict().values())
+
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(v, seen) for v in value.values())
+
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(v, seen) for v in value)
+
+    if hasattr(value, "__dict__"):
+        return estimate_nbytes(vars(value), seen)
+
+    return sys.getsizeof(value)
+
+
+class ModelCache:
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, disk_dir=None,
+                 max_disk_bytes=DEFAULT_MAX_DISK_BYTES):
+
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+
+        return os.path.join(self.disk_dir, f"{key}.joblib")
+
+    def _trim_disk(self):
+
+        # least recently used files go first; rescanned on every write since
+        # several worker processes may share the directory
+        files = []
+
+        for name in os.listdir(self.disk_dir):
+            try:
+                info = os.stat(os.path.join(self.disk_dir, name))
+            except FileNotFoundError:
+                continue
+            files.append((info.st_mtime, info.st_size, name))
+
+        total = sum(size for _, size, _ in files)
+
+        for _, size, name in sorted(files):
+
+            if total <= self.max_disk_bytes:
+                break
+
+            try:
+                os.remove(os.path.join(self.disk_dir, name))
+            except FileNotFoundError:
+                pass
+
+            total -= size
+
+            with self._lock:
+                self.disk_evictions += 1
+
+    def _store(self, key, value, size):
+
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self.bytes -= self._entries.pop(key)[1]
+
+        self._entries[key] = (value, size)
+        self.bytes += size
+
+        while self.bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def get(self, key):
+
+        with self._lock:
+
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        if self.disk_dir and os.path.exists(self._disk_path(key)):
+
+            try:
+                value = joblib.load(self._disk_path(key))
+                # mark it recently used for the disk trim
+                os.utime(self._disk_path(key))
+            except FileNotFoundError:
+                # trimmed by another process in between
+                value = None
+
+            if value is not None:
+
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store(key, value, estimate_nbytes(value))
+
+                return value
+
+        with self._lock:
+            self.misses += 1
+
+        return None
+
+    def put(self, key, value):
+
+        size = estimate_nbytes(value)
+
+        with self._lock:
+            self._store(key, value, size)
+
+        if self.disk_dir:
+            joblib.dump(value, self._disk_path(key))
+            self._trim_disk()
+
+    def get_or_fit(self, key, fit):
+
+        value = self.get(key)
+
+        if value is None:
+            value = fit()
+            self.put(key, value)
+
+        return value
+
+    def stats(self):
+
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "max_disk_bytes": self.max_disk_bytes
+            }
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+model_cache = ModelCache(
+    max_bytes=int(os.environ.get("MODEL_CACHE_BYTES", DEFAULT_MAX_BYTES)),
+    disk_dir=os.environ.get("MODEL_CACHE_DIR") or None,
+    max_disk_bytes=int(os.environ.get("MODEL_CACHE_DISK_BYTES", DEFAULT_MAX_DISK_BYTES))
+)
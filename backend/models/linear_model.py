@@ -1,7 +1,7 @@
 import numpy as np
 from sklearn.linear_model import LinearRegression
 
-def run_linear_regression(signal):
+def fit_linear_regression(signal):
 
     signal = np.array(signal)
 
@@ -11,6 +11,27 @@ def run_linear_regression(signal):
 
     model.fit(X, signal)
 
-    predicted = model.predict(X)
+    return model
+
+def predict_linear_regression(model, signal):
+
+    X = np.arange(len(signal)).reshape(-1,1)
+
+    return model.predict(X)
+
+def forecast_linear_regression(model, signal, horizon):
+
+    if horizon <= 0:
+        return np.empty(0)
+
+    X = np.arange(len(signal), len(signal) + horizon).reshape(-1,1)
+
+    return model.predict(X)
+
+def run_linear_regression(signal):
+
+    model = fit_linear_regression(signal)
+
+    predicted = predict_linear_regression(model, signal)
 
-    return predicted
\ No newline at end of file
+    return predicted
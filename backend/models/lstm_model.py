@@ -1,13 +1,184 @@
 import numpy as np
+import torch
+from torch import nn
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.preprocessing import MinMaxScaler
+
+WINDOW = 32
+HIDDEN = 32
+BATCH_SIZE = 256
+MAX_EPOCHS = 20
+PATIENCE = 3
+LEARNING_RATE = 3e-3
+MAX_WINDOWS_PER_EPOCH = 20_000
+VALIDATION_FRACTION = 0.1
+INFERENCE_BATCH = 8192
+
+
+class LSTMNet(nn.Module):
+
+    def __init__(self, hidden=HIDDEN):
+
+        super().__init__()
+
+        # constructor arguments, so a saved state_dict can be rebuilt
+        self.config = {"hidden": hidden}
+
+        self.lstm = nn.LSTM(1, hidden, batch_first=True)
+        self.head = nn.Linear(hidden, 1)
+
+    def forward(self, x):
+
+        out, _ = self.lstm(x.unsqueeze(-1))
+
+        return self.head(out[:, -1]).squeeze(-1)
+
+
+class LSTMModel:
+
+    # fitted network plus the scaler and window it was trained with
+
+    def __init__(self, net, scaler, window):
+
+        self.net = net
+        self.scaler = scaler
+        self.window = window
+
+
+def _windows(scaled, window):
+
+    # windows[i] = scaled[i : i + window] predicts scaled[i + window];
+    # a strided view, batches are copied out of it one at a time
+    return sliding_window_view(scaled[:-1], window), scaled[window:]
+
+
+def _batch(windows, index):
+
+    return torch.from_numpy(np.ascontiguousarray(windows[index]))
+
+
+def fit_lstm(signal, scaler=None):
+
+    signal = np.asarray(signal, dtype=np.float64)
+
+    if len(signal) < 3:
+        raise ValueError("LSTM needs at least 3 samples.")
+
+    scaler = scaler if scaler is not None else MinMaxScaler()
+
+    scaled = scaler.fit_transform(signal.reshape(-1, 1)).ravel().astype(np.float32)
+
+    window = max(1, min(WINDOW, len(signal) // 2))
+
+    X, y = _windows(scaled, window)
+
+    n_val = int(len(y) * VALIDATION_FRACTION)
+    n_train = len(y) - n_val
+
+    torch.manual_seed(42)
+    rng = np.random.default_rng(42)
+
+    net = LSTMNet()
+    optimizer = torch.optim.Adam(net.parameters(), lr=LEARNING_RATE)
+    loss_fn = nn.MSELoss()
+
+    best_loss = np.inf
+    best_state = None
+    stale = 0
+
+    for epoch in range(MAX_EPOCHS):
+
+        net.train()
+
+        order = rng.permutation(n_train)[:MAX_WINDOWS_PER_EPOCH]
+
+        for start in range(0, len(order), BATCH_SIZE):
+
+            index = order[start:start + BATCH_SIZE]
+
+            optimizer.zero_grad()
+            loss = loss_fn(net(_batch(X, index)), torch.from_numpy(y[index]))
+            loss.backward()
+            optimizer.step()
+
+        if n_val == 0:
+            continue
+
+        # early stopping on the most recent, held-out part of the series
+        val_index = np.arange(n_train, len(y))[-MAX_WINDOWS_PER_EPOCH:]
+
+        net.eval()
+
+        with torch.inference_mode():
+            val_loss = loss_fn(
+                net(_batch(X, val_index)), torch.from_numpy(y[val_index])
+            ).item()
+
+        if val_loss < best_loss:
+            best_loss = val_loss
+            best_state = {k: v.clone() for k, v in net.state_dict().items()}
+            stale = 0
+        else:
+            stale += 1
+            if stale >= PATIENCE:
+                break
+
+    if best_state is not None:
+        net.load_state_dict(best_state)
+
+    net.eval()
+
+    return LSTMModel(net, scaler, window)
+
+
+def predict_lstm(model, signal):
+
+    signal = np.asarray(signal, dtype=np.float64)
+
+    scaled = model.scaler.transform(signal.reshape(-1, 1)).ravel().astype(np.float32)
+
+    X, _ = _windows(scaled, model.window)
+
+    out = np.empty(len(X), dtype=np.float32)
+
+    with torch.inference_mode():
+        for start in range(0, len(X), INFERENCE_BATCH):
+            out[start:start + INFERENCE_BATCH] = model.net(
+                _batch(X, slice(start, start + INFERENCE_BATCH))
+            ).numpy()
+
+    # the first window samples have no history and are passed through
+    predicted = signal.copy()
+    predicted[model.window:] = model.scaler.inverse_transform(out.reshape(-1, 1)).ravel()
+
+    return predicted
+
+
+def forecast_lstm(model, signal, horizon):
+
+    signal = np.asarray(signal, dtype=np.float64)
+
+    window = model.scaler.transform(
+        signal[-model.window:].reshape(-1, 1)
+    ).ravel().astype(np.float32)
+
+    future = np.empty(max(0, horizon), dtype=np.float32)
+
+    with torch.inference_mode():
+        for step in range(len(future)):
+            future[step] = model.net(torch.from_numpy(window).unsqueeze(0)).item()
+            window = np.roll(window, -1)
+            window[-1] = future[step]
+
+    return model.scaler.inverse_transform(future.reshape(-1, 1)).ravel()
+
 
 def run_lstm(signal, scaler):
 
     signal = np.array(signal)
 
-    # simulate sequential prediction
-    predicted = np.roll(signal, -1)
+    model = fit_lstm(signal, scaler)
 
-    # add small noise to simulate prediction variance
-    predicted = predicted + np.random.normal(0, 0.05, len(signal))
+    predicted = predict_lstm(model, signal)
 
-    return signal, predicted
\ No newline at end of file
+    return signal, predicted
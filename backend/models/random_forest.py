@@ -1,19 +1,103 @@
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.ensemble import RandomForestRegressor
 
-def run_random_forest(signal):
+N_LAGS = 16
+MAX_SAMPLES = 50_000
+
+# rows per block for the window statistics, whose float64 temporaries
+# would otherwise be as large as the whole window matrix
+STATS_ROWS = 65_536
+
+
+def lag_features(signal, n_lags):
+
+    # windows[i] = signal[i : i + n_lags], a strided view with no copy
+    windows = sliding_window_view(signal, n_lags)
+
+    # trees split on float32 internally, so the matrix is allocated once in
+    # float32 and the windows are cast straight into it
+    features = np.empty((len(windows), n_lags + 2), dtype=np.float32)
+
+    features[:, :n_lags] = windows
+
+    for start in range(0, len(windows), STATS_ROWS):
+        block = windows[start:start + STATS_ROWS]
+        features[start:start + len(block), n_lags] = block.mean(axis=1)
+        features[start:start + len(block), n_lags + 1] = block.std(axis=1)
+
+    return features
 
-    signal = np.array(signal)
 
-    X = np.arange(len(signal)).reshape(-1,1)
+def _n_lags(length):
+
+    return max(1, min(N_LAGS, length // 2))
+
+
+def fit_random_forest(signal, n_jobs=-1):
+
+    signal = np.asarray(signal, dtype=np.float64)
+
+    if len(signal) < 3:
+        raise ValueError("Random Forest needs at least 3 samples.")
+
+    n_lags = _n_lags(len(signal))
+
+    # features from signal[t - n_lags : t] predict signal[t]
+    X = lag_features(signal[:-1], n_lags)
+    y = signal[n_lags:]
 
     model = RandomForestRegressor(
-        n_estimators=100,
+        n_estimators=50,
+        max_depth=10,
+        min_samples_leaf=5,
+        max_features=0.33,
+        max_samples=MAX_SAMPLES if len(y) > MAX_SAMPLES else None,
+        n_jobs=n_jobs,
         random_state=42
     )
 
-    model.fit(X, signal)
+    model.fit(X, y)
+
+    return model
+
+
+def predict_random_forest(model, signal):
+
+    signal = np.asarray(signal, dtype=np.float64)
+
+    n_lags = model.n_features_in_ - 2
+
+    # the first n_lags samples have no history and are passed through
+    predicted = signal.copy()
+    predicted[n_lags:] = model.predict(lag_features(signal[:-1], n_lags))
+
+    return predicted
+
+
+def forecast_random_forest(model, signal, horizon):
+
+    n_lags = model.n_features_in_ - 2
+
+    window = np.asarray(signal, dtype=np.float64)[-n_lags:].copy()
+
+    future = np.empty(max(0, horizon), dtype=np.float64)
+
+    # recursive multi-step: each step feeds the previous prediction back in
+    for step in range(len(future)):
+
+        future[step] = model.predict(lag_features(window, n_lags))[0]
+
+        window = np.roll(window, -1)
+        window[-1] = future[step]
+
+    return future
+
+
+def run_random_forest(signal):
+
+    model = fit_random_forest(signal)
 
-    predicted = model.predict(X)
+    predicted = predict_random_forest(model, signal)
 
-    return predicted
\ No newline at end of file
+    return predicted
@@ -0,0 +1,179 @@
+import copy
+import importlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import joblib
+
+REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR", "data/models")
+MAX_LOADED = int(os.environ.get("MODEL_REGISTRY_MAX_LOADED", 64))
+
+
+def _slug(text):
+
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-") or "asset"
+
+
+class ModelRegistry:
+
+    # root/<model_id>/model.joblib   fitted estimator (scaler included),
+    #                                pickled without its torch .net
+    #                 net.json       the .net's class and constructor config
+    #                 weights.pt     the .net's state_dict
+    #                 meta.json      asset, sensors, model, version, metrics
+
+    def __init__(self, root=REGISTRY_DIR, max_loaded=MAX_LOADED):
+
+        self.root = root
+        self.max_loaded = max_loaded
+
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _dir(self, model_id):
+
+        # ids are generated by save(); never let a request escape the root
+        if not re.fullmatch(r"[a-z0-9-]+", model_id):
+            raise KeyError(model_id)
+
+        return os.path.join(self.root, model_id)
+
+    def list(self, asset=None):
+
+        if not os.path.isdir(self.root):
+            return []
+
+        entries = []
+
+        for model_id in sorted(os.listdir(self.root)):
+
+            path = os.path.join(self.root, model_id, "meta.json")
+
+            if not os.path.exists(path):
+                continue
+
+            with open(path) as f:
+                meta = json.load(f)
+
+            if asset is None or meta["asset"] == asset:
+                entries.append(meta)
+
+        return entries
+
+    def save(self, asset, sensors, model_name, fitted, metadata=None):
+
+        sensors = sorted(sensors)
+
+        version = 1 + sum(
+            1 for meta in self.list(asset)
+            if meta["sensors"] == sensors and meta["model"] == model_name
+        )
+
+        model_id = f"{_slug(asset)}-{_slug(model_name)}-v{version}-{uuid.uuid4().hex[:8]}"
+
+        path = self._dir(model_id)
+        os.makedirs(path)
+
+        if hasattr(fitted, "net"):
+
+            import torch
+
+            net = fitted.net
+
+            # the weights live only in weights.pt, which load() maps
+            torch.save(net.state_dict(), os.path.join(path, "weights.pt"))
+
+            with open(os.path.join(path, "net.json"), "w") as f:
+                json.dump({
+                    "module": type(net).__module__,
+                    "class": type(net).__name__,
+                    "config": net.config
+                }, f)
+
+            fitted = copy.copy(fitted)
+            fitted.net = None
+
+        joblib.dump(fitted, os.path.join(path, "model.joblib"))
+
+        meta = {
+            "model_id": model_id,
+            "asset": asset,
+            "sensors": sensors,
+            "model": model_name,
+            "version": version,
+            "created": time.time(),
+            **(metadata or {})
+        }
+
+        # meta.json last: a model is only listed once it is complete
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+        return meta
+
+    def meta(self, model_id):
+
+        path = os.path.join(self._dir(model_id), "meta.json")
+
+        if not os.path.exists(path):
+            raise KeyError(model_id)
+
+        with open(path) as f:
+            return json.load(f)
+
+    def _empty_net(self, path):
+
+        # the net's layout from its config, parameters on the meta device
+        # (no memory) until load_state_dict assigns the mapped ones
+        import torch
+
+        with open(os.path.join(path, "net.json")) as f:
+            spec = json.load(f)
+
+        net_class = getattr(importlib.import_module(spec["module"]), spec["class"])
+
+        with torch.device("meta"):
+            return net_class(**spec["config"])
+
+    def load(self, model_id):
+
+        with self._lock:
+            if model_id in self._loaded:
+                self._loaded.move_to_end(model_id)
+                return self._loaded[model_id]
+
+        meta = self.meta(model_id)
+        path = self._dir(model_id)
+
+        # NumPy arrays in the pickle are memory-mapped read-only, so every
+        # worker serving this model shares the same page-cache copy
+        fitted = joblib.load(os.path.join(path, "model.joblib"), mmap_mode="r")
+
+        weights = os.path.join(path, "weights.pt")
+
+        if hasattr(fitted, "net") and os.path.exists(weights):
+
+            import torch
+
+            if fitted.net is None:
+                fitted.net = self._empty_net(path)
+
+            # the tensors are backed by the mapped file, shared like the arrays
+            state = torch.load(weights, mmap=True, weights_only=True)
+            fitted.net.load_state_dict(state, assign=True)
+            fitted.net.eval()
+
+        with self._lock:
+            self._loaded[model_id] = (meta, fitted)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+
+        return meta, fitted
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,470 @@
+import importlib
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from utils.data_quality import compute_data_quality, compute_data_quality_stacked
+from utils.fusion import fuse_sensors, fuse_stacked
+from utils.anomaly import (
+    OnlineAnomalyDetector,
+    compute_anomalies_and_health,
+    compute_anomalies_and_health_stacked
+)
+from utils.multivariate import fit_multivariate_baseline, score_multivariate, sensor_residuals
+from models.cache import model_cache, fingerprint
+from models.linear_model import (
+    fit_linear_regression,
+    predict_linear_regression,
+    forecast_linear_regression
+)
+from models.random_forest import (
+    fit_random_forest,
+    predict_random_forest,
+    forecast_random_forest
+)
+
+
+# ─────────────────────────────────────
+# MODEL REGISTRY
+# ─────────────────────────────────────
+
+def _lazy(module, name):
+
+    # torch-backed models are imported on first use, not with the pipeline
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module), name)(*args, **kwargs)
+
+    call.__name__ = name
+
+    return call
+
+
+class ModelSpec:
+
+    # executor: "process" for GIL-bound fits (trees), "thread" for work that
+    # can run on the calling thread; process_fit is the fit sent to a pool
+    # worker, which must stay on one core because the pool spans them all
+
+    def __init__(self, name, fit, predict, forecast=None, cacheable=True, executor="thread",
+                 process_fit=None):
+
+        self.name = name
+        self.fit = fit
+        self.process_fit = process_fit or fit
+        self.predict = predict
+        self.forecast = forecast
+        self.cacheable = cacheable
+        self.executor = executor
+
+
+MODELS = {
+    spec.name: spec for spec in [
+        ModelSpec(
+            "Linear Regression",
+            fit_linear_regression,
+            predict_linear_regression,
+            forecast_linear_regression
+        ),
+        ModelSpec(
+            "Random Forest",
+            fit_random_forest,
+            predict_random_forest,
+            forecast_random_forest,
+            executor="process",
+            process_fit=partial(fit_random_forest, n_jobs=1)
+        ),
+        ModelSpec(
+            "LSTM",
+            _lazy("models.lstm_model", "fit_lstm"),
+            _lazy("models.lstm_model", "predict_lstm"),
+            _lazy("models.lstm_model", "forecast_lstm")
+        ),
+        ModelSpec(
+            "Autoencoder",
+            _lazy("models.autoencoder", "load_or_fit_autoencoder"),
+            _lazy("models.autoencoder", "predict_autoencoder")
+        ),
+    ]
+}
+
+# model work for a batch fans out over this many threads
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", os.cpu_count() or 1))
+
+# "fused" thresholds the residual of the fused signal against the whole
+# series, "online" against rolling EWMA statistics as a stream would,
+# "multivariate" scores every sensor against a Mahalanobis baseline
+SCORING_MODES = ("fused", "online", "multivariate")
+
+# unknown model names fall back to the autoencoder, as the API always has
+DEFAULT_MODEL = "Autoencoder"
+
+
+def resolve_model(name):
+
+    return MODELS.get(name, MODELS[DEFAULT_MODEL])
+
+
+def fit_predict_model(signal, fit, predict):
+
+    # module level so it can be shipped to a process pool worker
+    fitted = fit(signal) if fit else None
+
+    return fitted, predict(fitted, signal)
+
+
+# ─────────────────────────────────────
+# INPUT
+# ─────────────────────────────────────
+
+def frame_from_records(records, sensors):
+
+    # row records as sent to /run-model (or a stored window frame) ->
+    # numeric frame and usable sensors
+    df = pd.DataFrame(records)
+
+    if df.empty:
+        raise ValueError("No data received")
+
+    df.columns = df.columns.str.strip().str.lower()
+
+    numeric_df = df.select_dtypes(include=np.number)
+
+    if numeric_df.shape[1] == 0:
+        raise ValueError("No numeric columns in data")
+
+    sensors = [s.lower() for s in sensors]
+
+    sensors = [s for s in sensors if s in numeric_df.columns]
+
+    if len(sensors) == 0:
+        sensors = numeric_df.columns.tolist()
+
+    return numeric_df, sensors
+
+
+def stack_assets(assets):
+
+    # (asset_id, {sensor: values}, sensors) triples -> assets grouped by
+    # (rows, sensors) shape so each group stacks into one 3-D array;
+    # assets that cannot be used get an error message instead
+    groups = {}
+    errors = {}
+
+    for position, (asset_id, data, sensors) in enumerate(assets):
+
+        data = {k.strip().lower(): v for k, v in data.items()}
+
+        sensors = [s.lower() for s in sensors if s.lower() in data]
+
+        if len(sensors) == 0:
+            sensors = list(data)
+
+        if len(sensors) < 2:
+            errors[position] = f"Need at least 2 sensor columns. Available: {list(data)}"
+            continue
+
+        try:
+            matrix = np.array([data[s] for s in sensors], dtype=np.float64).T
+        except (TypeError, ValueError):
+            errors[position] = "Sensor arrays must be numeric and of equal length"
+            continue
+
+        if len(matrix) == 0:
+            errors[position] = "No data received"
+            continue
+
+        matrix[np.isinf(matrix)] = np.nan
+
+        empty = [s for s, column in zip(sensors, matrix.T) if np.isnan(column).all()]
+
+        if empty:
+            errors[position] = f"Sensor columns have no readings: {empty}"
+            continue
+
+        groups.setdefault(matrix.shape, []).append((position, sensors, matrix))
+
+    return groups, errors
+
+
+# ─────────────────────────────────────
+# PIPELINE
+# ─────────────────────────────────────
+
+class Pipeline:
+
+    # data quality -> fusion -> fit/predict -> anomaly scoring, shared by the
+    # FastAPI endpoints and the Streamlit dashboard
+
+    def __init__(self, cache=model_cache, executors=None, in_worker=False):
+
+        self.cache = cache
+        self.executors = executors
+        # already inside a pool worker: process-executor fits run inline,
+        # single-core, since the pool's other workers share the machine
+        self.in_worker = in_worker
+        self.hooks = []
+        self._scratch = threading.local()
+        # multivariate baselines by fitted model, dropped with the model
+        self._baselines = weakref.WeakKeyDictionary()
+        self._baselines_lock = threading.Lock()
+
+    def add_hook(self, hook):
+
+        # hook(stage, seconds) is called after every stage
+        self.hooks.append(hook)
+
+    @contextmanager
+    def stage(self, name, timings=None):
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if timings is not None:
+                timings[name] = timings.get(name, 0.0) + elapsed
+            for hook in self.hooks:
+                hook(name, elapsed)
+
+    def _buffer(self, size):
+
+        # per-thread scratch vector, grown geometrically and reused across runs
+        buf = getattr(self._scratch, "error", None)
+
+        if buf is None or len(buf) < size:
+            buf = np.empty(max(size, 2 * len(buf) if buf is not None else size))
+            self._scratch.error = buf
+
+        return buf[:size]
+
+    def _runs_in_process(self, spec):
+
+        return (self.executors is not None or self.in_worker) and spec.fit and spec.executor == "process"
+
+    def _fit_process(self, spec, signal):
+
+        if self.in_worker:
+            return fit_predict_model(signal, spec.process_fit, spec.predict)
+
+        # with the pool disabled the fit runs inline and may use every core
+        if self.executors.processes <= 0:
+            return fit_predict_model(signal, spec.fit, spec.predict)
+
+        return self.executors.run_process(fit_predict_model, signal, spec.process_fit, spec.predict)
+
+    def fit_predict(self, spec, signal, sensors):
+
+        def fit():
+            if self._runs_in_process(spec):
+                return self._fit_process(spec, signal)
+            return fit_predict_model(signal, spec.fit, spec.predict)
+
+        if not spec.cacheable or self.cache is None:
+            return fit()
+
+        return self.cache.get_or_fit(fingerprint(signal, sensors, spec.name), fit)
+
+    def train(self, numeric_df, sensors, model, fusion="mean"):
+
+        # fit only, for models that are persisted and scored later
+        spec = resolve_model(model)
+
+        dq = compute_data_quality(numeric_df, sensors)
+
+        fused = self.fuse(dq, fusion)
+
+        if spec.fit is None:
+            raise ValueError(f"{spec.name} has no trainable state.")
+
+        if self._runs_in_process(spec):
+            fitted, _ = self._fit_process(spec, fused)
+        else:
+            fitted = spec.fit(fused)
+
+        return spec, fitted, dq
+
+    def baseline(self, fitted, residuals):
+
+        # one baseline (and covariance inverse) per fitted model: a stored or
+        # cached model scores later data against the residual covariance it
+        # was first scored with, without refitting or inverting it again
+        try:
+            weakref.ref(fitted)
+        except TypeError:
+            # no model state (or one that cannot be referenced): fit per call
+            return fit_multivariate_baseline(residuals)
+
+        with self._baselines_lock:
+            baseline = self._baselines.get(fitted)
+
+        if baseline is not None and baseline.n_sensors == residuals.shape[1]:
+            return baseline
+
+        baseline = fit_multivariate_baseline(residuals)
+
+        with self._baselines_lock:
+            self._baselines[fitted] = baseline
+
+        return baseline
+
+    def fuse(self, dq, strategy="mean"):
+
+        return fuse_sensors(
+            dq["filled_df"], list(dq["filled_df"].columns),
+            strategy, std=dq.get("sensor_std")
+        )
+
+    def run(self, numeric_df, sensors, model, horizon, dq=None, timings=None,
+            fitted=None, scoring="fused", fusion="mean"):
+
+        if scoring not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode: {scoring}")
+
+        spec = resolve_model(model)
+
+        # callers that already displayed data quality can pass it back in
+        if dq is None:
+            with self.stage("data_quality", timings):
+                dq = compute_data_quality(numeric_df, sensors)
+
+        with self.stage("fusion", timings):
+            fused = self.fuse(dq, fusion)
+
+        with self.stage("fit", timings):
+            if fitted is None:
+                fitted, predicted = self.fit_predict(spec, fused, sensors)
+            else:
+                # a stored model: score only, no fit
+                predicted = spec.predict(fitted, fused)
+
+        with self.stage("predict", timings):
+            if spec.forecast is not None:
+                future = spec.forecast(fitted, fused, horizon)
+            else:
+                future = np.full(horizon, predicted[-1])
+
+        drivers = None
+
+        with self.stage("anomaly", timings):
+            if scoring == "multivariate":
+                columns = list(dq["filled_df"].columns)
+                residuals = sensor_residuals(dq["filled_df"].to_numpy(), fused, predicted)
+                anomalies, drivers, _, health = score_multivariate(
+                    self.baseline(fitted, residuals), residuals, columns
+                )
+            elif scoring == "online":
+                anomalies, _, health = OnlineAnomalyDetector().score(fused, predicted)
+            else:
+                anomalies, _, health = compute_anomalies_and_health(
+                    fused, predicted, out=self._buffer(len(fused))
+                )
+
+        result = {
+            "actual": fused,
+            "predicted": np.asarray(predicted),
+            "future": np.asarray(future),
+            "anomalies": anomalies,
+            "health": float(np.nan_to_num(np.mean(health))),
+            "noise": float(np.nan_to_num(dq["noise"])),
+            "data_quality": {
+                k: v for k, v in dq.items() if k not in ("filled_df", "sensor_std")
+            },
+            "model": spec.name
+        }
+
+        if drivers is not None:
+            result["anomaly_sensors"] = drivers
+
+        return result
+
+    def _fit_forecast(self, spec, signal, sensors, horizon):
+
+        fitted, predicted = self.fit_predict(spec, signal, sensors)
+
+        if spec.forecast is not None:
+            future = spec.forecast(fitted, signal, horizon)
+        else:
+            future = np.full(horizon, predicted[-1])
+
+        return np.asarray(predicted), np.asarray(future)
+
+    def _try_fit_forecast(self, spec, signal, sensors, horizon):
+
+        try:
+            return self._fit_forecast(spec, signal, sensors, horizon)
+        except Exception as e:
+            return e
+
+    def run_batch(self, assets, model, horizon, timings=None, fusion="mean"):
+
+        # data quality, fusion and anomaly scoring run once per group of
+        # equally shaped assets on stacked arrays; fits fan out over threads
+        # (tree fits go on to the process pool from there)
+        spec = resolve_model(model)
+
+        with self.stage("parse", timings):
+            groups, errors = stack_assets(assets)
+
+        results = [None] * len(assets)
+
+        for position, message in errors.items():
+            results[position] = {"asset_id": assets[position][0], "error": message}
+
+        with ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="batch") as pool:
+
+            for members in groups.values():
+
+                with self.stage("data_quality", timings):
+                    dq = compute_data_quality_stacked(np.stack([m[2] for m in members]))
+
+                with self.stage("fusion", timings):
+                    fused = fuse_stacked(dq["filled"], fusion, std=dq["sensor_std"])
+
+                with self.stage("fit", timings):
+                    outputs = list(pool.map(
+                        lambda k: self._try_fit_forecast(spec, fused[k], members[k][1], horizon),
+                        range(len(members))
+                    ))
+
+                # an asset whose model cannot be fit gets an error entry,
+                # the rest of the group is scored without it
+                fitted = [k for k, output in enumerate(outputs) if not isinstance(output, Exception)]
+
+                for k, output in enumerate(outputs):
+                    if isinstance(output, Exception):
+                        position = members[k][0]
+                        results[position] = {"asset_id": assets[position][0], "error": str(output)}
+
+                if not fitted:
+                    continue
+
+                with self.stage("anomaly", timings):
+                    anomalies, health = compute_anomalies_and_health_stacked(
+                        fused[fitted], np.stack([outputs[k][0] for k in fitted])
+                    )
+
+                for i, k in enumerate(fitted):
+                    position, sensors, _ = members[k]
+                    results[position] = {
+                        "asset_id": assets[position][0],
+                        "sensors_used": sensors,
+                        "future": outputs[k][1],
+                        "anomalies": anomalies[i],
+                        "health": float(np.nan_to_num(health[i])),
+                        "noise": float(np.nan_to_num(dq["noise"][k])),
+                        "data_quality": {
+                            key: float(np.nan_to_num(dq[key][k]))
+                            for key in ("missing_pct", "noise", "outlier_pct", "quality_score")
+                        },
+                        "model": spec.name
+                    }
+
+        return results
@@ -0,0 +1,288 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+STORE_ROWS = int(os.environ.get("STORE_ROWS", 100_000))
+
+# optional longer retention: a second, larger ring per asset backed by a
+# memory-mapped file, so old history lives in the page cache, not the heap.
+# Its position is kept in a small mapped state file next to it, so the
+# history survives a restart (it is not fsync'd, so not a crash log)
+STORE_SPILL_DIR = os.environ.get("STORE_SPILL_DIR")
+STORE_SPILL_ROWS = int(os.environ.get("STORE_SPILL_ROWS", 5_000_000))
+
+
+class Ring:
+
+    # (sensors, capacity) float32 ring: each sensor's history is one
+    # contiguous row, so a window of one sensor is a slice, not a gather
+
+    __slots__ = ("data", "capacity", "head", "size")
+
+    def __init__(self, data):
+
+        self.data = data
+        self.capacity = data.shape[1]
+        self.head = 0
+        self.size = 0
+
+    def write(self, block):
+
+        # block: (sensors, k), oldest sample first
+        k = block.shape[1]
+
+        if k >= self.capacity:
+            self.data[:] = block[:, -self.capacity:]
+            self.head = 0
+            self.size = self.capacity
+            return
+
+        first = min(k, self.capacity - self.head)
+
+        self.data[:, self.head:self.head + first] = block[:, :first]
+        self.data[:, :k - first] = block[:, first:]
+
+        self.head = (self.head + k) % self.capacity
+        self.size = min(self.size + k, self.capacity)
+
+    def tail(self, n):
+
+        # last n samples as a (sensors, n) copy, oldest first
+        n = min(n, self.size)
+
+        start = (self.head - n) % self.capacity
+
+        if start + n <= self.capacity:
+            return self.data[:, start:start + n].copy()
+
+        return np.concatenate([self.data[:, start:], self.data[:, :self.head]], axis=1)
+
+
+class AssetSeries:
+
+    __slots__ = ("asset_id", "sensors", "positions", "hot", "cold", "state", "total", "updated", "lock")
+
+    def __init__(self, asset_id, sensors, hot, cold=None, state=None):
+
+        self.asset_id = asset_id
+        self.sensors = sensors
+        self.positions = {s: j for j, s in enumerate(sensors)}
+        self.hot = hot
+        self.cold = cold
+        # cold ring's (head, size, total) as a mapped int64 array
+        self.state = state
+        self.total = 0
+        self.updated = None
+        self.lock = threading.Lock()
+
+    def to_dict(self):
+
+        return {
+            "asset_id": self.asset_id,
+            "sensors": self.sensors,
+            "total_rows": self.total,
+            "buffered_rows": self.available(),
+            "updated": self.updated
+        }
+
+    def available(self):
+
+        return max(self.hot.size, self.cold.size if self.cold is not None else 0)
+
+
+class TimeSeriesStore:
+
+    # recent sensor history per asset in preallocated rings; the sensor
+    # set of an asset is fixed by its first append
+
+    def __init__(self, capacity=STORE_ROWS, spill_dir=STORE_SPILL_DIR, spill_rows=STORE_SPILL_ROWS):
+
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+        self.spill_rows = spill_rows
+
+        self._series = {}
+        self._lock = threading.Lock()
+
+        if self._spills():
+            self._restore()
+
+    def _spills(self):
+
+        return bool(self.spill_dir) and self.spill_rows > self.capacity
+
+    def _spill_path(self, asset_id, ext="f32"):
+
+        name = hashlib.blake2b(asset_id.encode(), digest_size=8).hexdigest()
+
+        return os.path.join(self.spill_dir, f"{name}.{ext}")
+
+    def _hot(self, sensors):
+
+        return Ring(np.full((len(sensors), self.capacity), np.nan, dtype=np.float32))
+
+    def _create(self, asset_id, sensors):
+
+        if not self._spills():
+            return AssetSeries(asset_id, sensors, self._hot(sensors))
+
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+        # identity first: a restart only reopens rings it can describe
+        with open(self._spill_path(asset_id, "json"), "w") as f:
+            json.dump({"asset_id": asset_id, "sensors": sensors, "rows": self.spill_rows}, f)
+
+        cold = Ring(np.memmap(
+            self._spill_path(asset_id), dtype=np.float32, mode="w+",
+            shape=(len(sensors), self.spill_rows)
+        ))
+
+        state = np.memmap(self._spill_path(asset_id, "state"), dtype=np.int64, mode="w+", shape=(3,))
+
+        return AssetSeries(asset_id, sensors, self._hot(sensors), cold, state)
+
+    def _reopen(self, meta_path):
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        asset_id, sensors = meta["asset_id"], meta["sensors"]
+
+        cold = Ring(np.memmap(
+            self._spill_path(asset_id), dtype=np.float32, mode="r+",
+            shape=(len(sensors), meta["rows"])
+        ))
+
+        state = np.memmap(self._spill_path(asset_id, "state"), dtype=np.int64, mode="r+", shape=(3,))
+
+        cold.head, cold.size = int(state[0]), int(state[1])
+
+        series = AssetSeries(asset_id, sensors, self._hot(sensors), cold, state)
+        series.total = int(state[2])
+
+        return series
+
+    def _restore(self):
+
+        # spilled assets from a previous process; the hot rings start empty
+        # and windows are served from the cold ring until they refill
+        if not os.path.isdir(self.spill_dir):
+            return
+
+        for name in os.listdir(self.spill_dir):
+
+            if not name.endswith(".json"):
+                continue
+
+            try:
+                series = self._reopen(os.path.join(self.spill_dir, name))
+            except (OSError, ValueError, KeyError):
+                continue
+
+            self._series[series.asset_id] = series
+
+    def series(self, asset_id, sensors=None):
+
+        with self._lock:
+
+            if asset_id not in self._series:
+
+                if not sensors:
+                    raise KeyError(asset_id)
+
+                self._series[asset_id] = self._create(asset_id, list(sensors))
+
+            return self._series[asset_id]
+
+    def append(self, asset_id, data):
+
+        # data: {sensor: values}; sensors missing from data are stored as
+        # NaN, sensors the asset does not have are rejected
+        data = {k.strip().lower(): v for k, v in data.items()}
+
+        if not data:
+            raise ValueError("data must map at least one sensor to values")
+
+        series = self.series(asset_id, list(data))
+
+        unknown = [sensor for sensor in data if sensor not in series.positions]
+
+        if unknown:
+            raise ValueError(f"Unknown sensors for asset {asset_id}: {unknown}. Available: {series.sensors}")
+
+        rows = max((len(v) for v in data.values()), default=0)
+
+        block = np.full((len(series.sensors), rows), np.nan, dtype=np.float32)
+
+        for sensor, values in data.items():
+            values = np.asarray(values, dtype=np.float32)
+            if len(values) != rows:
+                raise ValueError("Sensor arrays must be of equal length")
+            block[series.positions[sensor]] = values
+
+        with series.lock:
+
+            series.hot.write(block)
+
+            series.total += rows
+
+            if series.cold is not None:
+                series.cold.write(block)
+                series.state[:] = (series.cold.head, series.cold.size, series.total)
+            series.updated = time.time()
+
+            return series.total
+
+    def window(self, asset_id, rows=None, sensors=None):
+
+        # last rows samples (all retained by default) as a float32 frame
+        if rows is not None and rows <= 0:
+            raise ValueError("rows must be a positive number of rows")
+
+        series = self.series(asset_id)
+
+        with series.lock:
+
+            rows = series.available() if rows is None else rows
+
+            ring = series.hot
+
+            if rows > series.hot.size and series.cold is not None:
+                ring = series.cold
+
+            block = ring.tail(rows)
+            start = series.total - block.shape[1]
+
+        columns = [s for s in (sensors or series.sensors) if s in series.positions]
+
+        return pd.DataFrame(
+            {s: block[series.positions[s]] for s in columns},
+            index=pd.RangeIndex(start, start + block.shape[1])
+        )
+
+    def assets(self):
+
+        with self._lock:
+            series = list(self._series.values())
+
+        return [s.to_dict() for s in series]
+
+    def drop(self, asset_id):
+
+        with self._lock:
+            series = self._series.pop(asset_id, None)
+
+        if series is None:
+            return False
+
+        if series.cold is not None:
+            series.cold = series.state = None
+            for ext in ("json", "state", "f32"):
+                os.remove(self._spill_path(asset_id, ext))
+
+        return True
@@ -0,0 +1,203 @@
+import os
+import threading
+
+import numpy as np
+
+from utils.data_quality import DataQualityAccumulator
+from utils.fusion import fuse_matrix
+from utils.anomaly import OnlineAnomalyDetector, ewma
+from store import TimeSeriesStore
+
+# smoothing of the fused level used as the one-step-ahead prediction
+LEVEL_ALPHA = float(os.environ.get("TELEMETRY_LEVEL_ALPHA", 0.05))
+
+# strategies that fuse a row from running per-sensor stats alone; the
+# normalized and pca kernels centre on the batch itself, which is
+# meaningless for a handful of samples
+STREAM_FUSION = ("mean", "inverse_variance", "median")
+
+
+class AssetStream:
+
+    # everything kept per asset between micro-batches: the sensor layout of
+    # the first batch, running data quality, the fused level and the online
+    # detector; raw samples go to the time-series store
+
+    def __init__(self, asset_id, sensors, store, fusion="mean"):
+
+        if len(sensors) < 2:
+            raise ValueError(f"Need at least 2 sensor columns. Available: {sensors}")
+
+        if fusion not in STREAM_FUSION:
+            raise ValueError(f"Fusion strategy not supported for streams: {fusion}")
+
+        self.asset_id = asset_id
+        self.sensors = sensors
+        self.fusion = fusion
+
+        self.quality = DataQualityAccumulator(len(sensors))
+        self.detector = OnlineAnomalyDetector()
+        self.store = store
+
+        self.level = None
+        self.seen = 0
+        self.health = 100.0
+        self.lock = threading.Lock()
+
+    def _matrix(self, data):
+
+        # columns in this stream's sensor order; absent sensors are missing
+        rows = max((len(v) for v in data.values()), default=0)
+
+        matrix = np.full((rows, len(self.sensors)), np.nan)
+
+        for j, sensor in enumerate(self.sensors):
+            if sensor in data:
+                column = np.array(data[sensor], dtype=np.float64)
+                if len(column) != rows:
+                    raise ValueError("Sensor arrays must be of equal length")
+                matrix[:, j] = column
+
+        matrix[np.isinf(matrix)] = np.nan
+
+        return matrix
+
+    def push(self, data):
+
+        with self.lock:
+
+            matrix = self._matrix(data)
+
+            start = self.seen
+
+            if len(matrix) == 0:
+                return self._event(start, 0, np.empty(0, dtype=np.int64), np.empty(0))
+
+            self.store.append(self.asset_id, {s: matrix[:, j] for j, s in enumerate(self.sensors)})
+
+            # data quality over everything seen so far, outliers judged
+            # against the running moments
+            self.quality.update(matrix)
+            self.quality.count_outliers(matrix)
+
+            # sensors with no readings yet have no mean or std to fill and
+            # weight with; like fuse_sensors, they are left out of the fusion
+            std = self.quality.column_std()
+            keep = ~np.isnan(std)
+
+            if not keep.any():
+                # nothing to fuse: the level and detector stay unseeded, so
+                # they never start from a NaN
+                self.seen += len(matrix)
+                return self._event(
+                    start, len(matrix), np.empty(0, dtype=np.int64),
+                    np.full(len(matrix), self.health), np.full(len(matrix), np.nan)
+                )
+
+            matrix, std = matrix[:, keep], std[keep]
+
+            missing = np.isnan(matrix)
+
+            if missing.any():
+                matrix[missing] = np.broadcast_to(self.quality.column_means()[keep], matrix.shape)[missing]
+
+            fused = fuse_matrix(matrix, self.fusion, std=std)
+
+            # the previous fused level is the prediction for each new sample
+            level0 = fused[0] if self.level is None else self.level
+            levels = ewma(fused, LEVEL_ALPHA, level0)
+            predicted = np.concatenate([[level0], levels[:-1]])
+            self.level = float(levels[-1])
+
+            anomalies, _, health = self.detector.score(fused, predicted)
+
+            self.seen += len(matrix)
+            self.health = float(np.nan_to_num(health.mean()))
+
+            return self._event(start, len(matrix), anomalies, health, fused)
+
+    def _event(self, start, samples, anomalies, health, fused=None):
+
+        quality = {k: float(np.nan_to_num(v)) for k, v in self.quality.result().items()}
+
+        return {
+            "type": "score",
+            "asset_id": self.asset_id,
+            "start": start,
+            "samples": samples,
+            "health": self.health if samples else None,
+            "min_health": float(np.nan_to_num(health.min())) if samples else None,
+            "anomalies": (start + anomalies).tolist(),
+            "anomaly_values": np.nan_to_num(fused[anomalies]).tolist() if samples else [],
+            "data_quality": quality
+        }
+
+
+class TelemetryHub:
+
+    def __init__(self, store=None):
+
+        self.store = store if store is not None else TimeSeriesStore()
+        self.streams = {}
+        self._lock = threading.Lock()
+
+    def stream(self, asset_id, sensors, fusion="mean"):
+
+        # the first batch of an asset fixes its sensors and fusion
+        with self._lock:
+
+            if asset_id not in self.streams:
+                self.streams[asset_id] = AssetStream(asset_id, sensors, self.store, fusion)
+
+            return self.streams[asset_id]
+
+    def push(self, message):
+
+        # message: {"asset_id", "data": {sensor: [values]}, "fusion"?}
+        if not isinstance(message, dict):
+            raise ValueError("Telemetry messages must be JSON objects")
+
+        asset_id = message.get("asset_id")
+
+        if not asset_id:
+            raise ValueError("asset_id is required")
+
+        data = message.get("data") or {}
+
+        if not isinstance(data, dict):
+            raise ValueError("data must map sensor names to arrays")
+
+        data = {k.strip().lower(): v for k, v in data.items()}
+
+        stream = self.stream(asset_id, list(data), message.get("fusion", "mean"))
+
+        return stream.push(data)
+
+    def get(self, asset_id):
+
+        with self._lock:
+            return self.streams.get(asset_id)
+
+    def remove(self, asset_id):
+
+        with self._lock:
+            return self.streams.pop(asset_id, None) is not None
+
+    def stats(self):
+
+        with self._lock:
+            streams = list(self.streams.values())
+
+        return {
+            "assets": len(streams),
+            "samples": sum(s.seen for s in streams),
+            "streams": [
+                {
+                    "asset_id": s.asset_id,
+                    "sensors": s.sensors,
+                    "samples": s.seen,
+                    "health": s.health
+                }
+                for s in streams
+            ]
+        }
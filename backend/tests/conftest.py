@@ -0,0 +1,6 @@
+import os
+import sys
+
+# the backend runs from its own directory (imports are "from utils..."),
+# so the tests put it on the path the same way the benchmarks do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,35 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from store import TimeSeriesStore
+
+
+def test_append_rejects_empty_and_unknown_sensors():
+
+    store = TimeSeriesStore(spill_dir=None)
+
+    with pytest.raises(ValueError):
+        store.append("pump-1", {})
+
+    assert store.append("pump-1", {"a": [1.0, 2.0], "b": [3.0, 4.0]}) == 2
+
+    with pytest.raises(ValueError):
+        store.append("pump-1", {"c": [1.0]})
+
+    with pytest.raises(ValueError):
+        store.append("pump-1", {})
+
+    assert store.window("pump-1").shape == (2, 2)
+
+
+def test_append_samples_endpoint_returns_400():
+
+    client = TestClient(api.app)
+
+    assert client.post("/assets/test-empty/samples", json={"data": {}}).status_code == 400
+
+    assert client.post("/assets/test-known/samples", json={"data": {"a": [1.0], "b": [2.0]}}).status_code == 200
+    assert client.post("/assets/test-known/samples", json={"data": {"x": [1.0]}}).status_code == 400
+
+    client.delete("/assets/test-known")
@@ -0,0 +1,57 @@
+import numpy as np
+
+from store import TimeSeriesStore
+from telemetry import AssetStream
+
+
+def _batches(n_batches=20, rows=50, seed=0):
+
+    rng = np.random.default_rng(seed)
+
+    t = np.arange(n_batches * rows)
+    a = 50 + np.sin(t / 30) + rng.normal(0, 0.2, len(t))
+    b = 20 + np.cos(t / 30) + rng.normal(0, 0.2, len(t))
+    c = 80 + rng.normal(0, 0.2, len(t))
+
+    for i in range(n_batches):
+        rows_ = slice(i * rows, (i + 1) * rows)
+        yield {"a": a[rows_].tolist(), "b": b[rows_].tolist(), "c": c[rows_].tolist()}
+
+
+def _run(null_first):
+
+    stream = AssetStream("pump-1", ["a", "b", "c"], TimeSeriesStore(spill_dir=None))
+
+    for i, batch in enumerate(_batches()):
+        if null_first and i == 0:
+            batch["c"] = [None] * len(batch["c"])
+        event = stream.push(batch)
+
+    return stream, event
+
+
+def test_sensor_null_in_first_batch_does_not_poison_the_stream():
+
+    stream, event = _run(null_first=True)
+    _, baseline = _run(null_first=False)
+
+    assert np.isfinite(stream.level)
+    assert np.isfinite(stream.detector.mean) and np.isfinite(stream.detector.var)
+    assert event["health"] > 0
+    assert abs(event["health"] - baseline["health"]) < 25
+
+
+def test_all_null_first_batch_leaves_the_stream_unseeded():
+
+    stream = AssetStream("pump-2", ["a", "b"], TimeSeriesStore(spill_dir=None))
+
+    event = stream.push({"a": [None] * 5, "b": [None] * 5})
+
+    assert event["samples"] == 5
+    assert event["anomalies"] == []
+    assert stream.level is None and stream.detector.n == 0
+
+    event = stream.push({"a": [1.0, 1.1, 0.9], "b": [2.0, 2.1, 1.9]})
+
+    assert np.isfinite(stream.level)
+    assert event["health"] == 100.0
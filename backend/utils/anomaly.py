@@ -1,11 +1,16 @@
+import math
+
 import numpy as np
+from scipy.signal import lfilter
 
-def compute_anomalies_and_health(actual, predicted):
+def compute_anomalies_and_health(actual, predicted, out=None):
 
-    actual = np.array(actual)
-    predicted = np.array(predicted)
+    actual = np.asarray(actual, dtype=np.float64)
+    predicted = np.asarray(predicted, dtype=np.float64)
 
-    error = np.abs(actual - predicted)
+    # out lets callers reuse a scratch buffer for the error vector
+    error = np.subtract(actual, predicted, out=out)
+    np.abs(error, out=error)
 
     threshold = error.mean() + 2 * error.std()
 
@@ -13,4 +18,156 @@ def compute_anomalies_and_health(actual, predicted):
 
     health = 100 - (error / (np.max(error) + 1e-6) * 100)
 
-    return anomalies, error, health
\ No newline at end of file
+    return anomalies, error, health
+
+
+def compute_anomalies_and_health_stacked(actual, predicted):
+
+    # row-wise compute_anomalies_and_health over (assets, rows) arrays;
+    # returns a list of anomaly index arrays and the mean health per asset
+    error = np.abs(np.asarray(actual, dtype=np.float64) - np.asarray(predicted, dtype=np.float64))
+
+    threshold = error.mean(axis=1) + 2 * error.std(axis=1)
+
+    rows, cols = np.nonzero(error > threshold[:, None])
+
+    anomalies = np.split(cols, np.searchsorted(rows, np.arange(1, len(error))))
+
+    health = 100 - (error / (error.max(axis=1, keepdims=True) + 1e-6) * 100)
+
+    return anomalies, health.mean(axis=1)
+
+
+# ─────────────────────────────────────
+# ONLINE SCORING
+# ─────────────────────────────────────
+
+EWMA_ALPHA = 0.01
+THRESHOLD_Z = 3.0
+HEALTH_Z = 4.0
+WARMUP = 30
+
+
+def _linear_recurrence(x, decay, y0):
+
+    # y[t] = decay * y[t-1] + x[t] with y[-1] = y0, as a first-order IIR
+    # filter; the initial state carries y0 into the first sample
+    if len(x) == 0:
+        return np.empty(0)
+
+    y, _ = lfilter([1.0], [1.0, -decay], x, zi=[decay * y0])
+
+    return y
+
+
+def ewma(values, alpha, initial):
+
+    # level[t] = (1 - alpha) * level[t-1] + alpha * values[t]
+    values = np.asarray(values, dtype=np.float64)
+
+    return _linear_recurrence(alpha * values, 1 - alpha, initial)
+
+
+class OnlineAnomalyDetector:
+
+    # EWMA mean/variance of the residual. Each point is judged against the
+    # statistics of the points before it: anomalous above mean + z * std,
+    # health falls linearly to 0 at mean + HEALTH_Z * std. No point is
+    # flagged (and health stays 100) until warmup points have been seen.
+    # update() scores one point in O(1); score() is the vectorized path
+    # for a batch and leaves the detector in the same state.
+
+    def __init__(self, alpha=EWMA_ALPHA, z=THRESHOLD_Z, warmup=WARMUP):
+
+        if not 0 < alpha < 1:
+            raise ValueError("alpha must be between 0 and 1")
+
+        self.alpha = alpha
+        self.z = z
+        self.warmup = warmup
+
+        self.n = 0
+        self.mean = 0.0
+        self.var = 0.0
+
+    def _health(self, error, mean, std):
+
+        limit = mean + HEALTH_Z * std + 1e-6
+
+        return 100 * np.clip(1 - error / limit, 0, 1)
+
+    def update(self, actual, predicted):
+
+        error = abs(float(actual) - float(predicted))
+
+        if self.n == 0:
+            self.mean = error
+
+        std = math.sqrt(self.var)
+
+        if self.n >= self.warmup:
+            anomaly = error > self.mean + self.z * std
+            limit = self.mean + HEALTH_Z * std + 1e-6
+            health = 100 * min(max(1 - error / limit, 0.0), 1.0)
+        else:
+            anomaly = False
+            health = 100.0
+
+        delta = error - self.mean
+        self.mean += self.alpha * delta
+        self.var = (1 - self.alpha) * (self.var + self.alpha * delta ** 2)
+        self.n += 1
+
+        return anomaly, error, health
+
+    def score(self, actual, predicted):
+
+        # same (anomalies, error, health) shape as compute_anomalies_and_health
+        error = np.abs(
+            np.asarray(actual, dtype=np.float64) - np.asarray(predicted, dtype=np.float64)
+        )
+
+        if len(error) == 0:
+            return np.empty(0, dtype=np.int64), error, np.empty(0)
+
+        a = self.alpha
+
+        mean0 = error[0] if self.n == 0 else self.mean
+
+        mean = ewma(error, a, mean0)
+        mean_before = np.concatenate([[mean0], mean[:-1]])
+
+        delta = error - mean_before
+
+        var = _linear_recurrence((1 - a) * a * delta ** 2, 1 - a, self.var)
+        std_before = np.sqrt(np.concatenate([[self.var], var[:-1]]))
+
+        warm = self.n + np.arange(len(error)) >= self.warmup
+
+        anomalies = np.flatnonzero(warm & (error > mean_before + self.z * std_before))
+
+        health = np.where(warm, self._health(error, mean_before, std_before), 100.0)
+
+        self.n += len(error)
+        self.mean = float(mean[-1])
+        self.var = float(var[-1])
+
+        return anomalies, error, health
+
+    def state(self):
+
+        return {
+            "alpha": self.alpha, "z": self.z, "warmup": self.warmup,
+            "n": self.n, "mean": self.mean, "var": self.var
+        }
+
+    @classmethod
+    def from_state(cls, state):
+
+        detector = cls(state["alpha"], state["z"], state["warmup"])
+
+        detector.n = state["n"]
+        detector.mean = state["mean"]
+        detector.var = state["var"]
+
+        return detector
@@ -1,44 +1,221 @@
 import numpy as np
 import pandas as pd
 
-def compute_data_quality(numeric_df, sensors):
+BLOCK_ROWS = 65_536
+
+
+class DataQualityAccumulator:
+
+    # Pass 1 (update/merge) keeps Welford running count, mean and M2 per
+    # sensor. Pass 2 (count_outliers) re-scans the rows against the merged
+    # moments. Both passes accept arbitrary row chunks and partial
+    # accumulators from different workers can be merged.
+
+    def __init__(self, n_sensors):
+
+        self.rows = 0
+        self.count = np.zeros(n_sensors, dtype=np.float64)
+        self.mean = np.zeros(n_sensors, dtype=np.float64)
+        self.m2 = np.zeros(n_sensors, dtype=np.float64)
+        self.outliers = 0
+
+    def _combine(self, count, mean, m2):
+
+        total = self.count + count
+        safe = np.where(total > 0, total, 1)
+
+        delta = mean - self.mean
+
+        self.mean = self.mean + delta * count / safe
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / safe
+        self.count = total
+
+    def update(self, values):
+
+        values = np.asarray(values, dtype=np.float64)
+
+        if values.ndim == 1:
+            values = values.reshape(-1, 1)
+
+        missing = np.isnan(values)
+
+        count = (~missing).sum(axis=0).astype(np.float64)
+
+        mean = np.where(missing, 0.0, values).sum(axis=0) / np.where(count > 0, count, 1)
+
+        dev = np.where(missing, 0.0, values - mean)
+
+        m2 = np.einsum("ij,ij->j", dev, dev)
+
+        self._combine(count, mean, m2)
+
+        self.rows += values.shape[0]
+
+        return self
+
+    def merge(self, other):
+
+        self._combine(other.count, other.mean, other.m2)
+
+        self.rows += other.rows
+        self.outliers += other.outliers
+
+        return self
+
+    def column_means(self):
+
+        return np.where(self.count > 0, self.mean, np.nan)
+
+    def column_std(self):
+
+        # std of the mean-filled column: filled cells add no deviation but
+        # do count towards the sample size
+        if self.rows < 2:
+            return np.full(self.count.shape, np.nan)
+
+        std = np.sqrt(self.m2 / (self.rows - 1))
+
+        return np.where(self.count > 0, std, np.nan)
+
+    def count_outliers(self, values):
+
+        values = np.asarray(values, dtype=np.float64)
 
-    numeric_df = numeric_df.copy()
+        if values.ndim == 1:
+            values = values.reshape(-1, 1)
 
-    numeric_df.columns = numeric_df.columns.str.strip().str.lower()
+        mean = self.column_means()
+
+        std = self.column_std()
+        std = np.where(std == 0, 1.0, std)
+
+        with np.errstate(invalid="ignore"):
+            self.outliers += int(np.count_nonzero(np.abs(values - mean) / std > 3))
+
+        return self
+
+    def result(self):
+
+        total_cells = self.rows * self.count.shape[0]
+
+        if total_cells > 0:
+            missing_pct = (total_cells - self.count.sum()) / total_cells * 100
+            outlier_pct = self.outliers / total_cells * 100
+        else:
+            missing_pct = 0
+            outlier_pct = 0
+
+        std = self.column_std()
+
+        noise = std[~np.isnan(std)].mean() if np.any(~np.isnan(std)) else np.nan
+
+        quality_score = max(0, 100 - missing_pct - outlier_pct)
+
+        return {
+            "missing_pct": missing_pct,
+            "noise": noise,
+            "outlier_pct": outlier_pct,
+            "quality_score": quality_score
+        }
+
+
+def compute_data_quality(numeric_df, sensors):
+
+    columns = numeric_df.columns.str.strip().str.lower()
 
     sensors = [s.strip().lower() for s in sensors]
 
-    sensors = [s for s in sensors if s in numeric_df.columns]
+    sensors = [s for s in sensors if s in columns]
 
     if len(sensors) < 2:
-        raise ValueError(f"Need at least 2 sensor columns. Available: {numeric_df.columns.tolist()}")
-
-    sensor_df = numeric_df[sensors]
+        raise ValueError(f"Need at least 2 sensor columns. Available: {columns.tolist()}")
 
-    total_cells = sensor_df.size
+    positions = [columns.get_loc(s) for s in sensors]
 
-    missing_pct = (
-        sensor_df.isnull().sum().sum() / total_cells * 100
-        if total_cells > 0 else 0
-    )
+    values = numeric_df.iloc[:, positions].to_numpy(dtype=np.float64, copy=True)
 
-    filled_df = sensor_df.fillna(sensor_df.mean())
+    acc = DataQualityAccumulator(len(sensors))
 
-    noise = filled_df.std().mean()
+    for start in range(0, len(values), BLOCK_ROWS):
+        acc.update(values[start:start + BLOCK_ROWS])
 
-    std = filled_df.std().replace(0, 1)
+    for start in range(0, len(values), BLOCK_ROWS):
+        acc.count_outliers(values[start:start + BLOCK_ROWS])
 
-    z_scores = np.abs((filled_df - filled_df.mean()) / std)
+    missing = np.isnan(values)
 
-    outlier_pct = (z_scores > 3).sum().sum() / total_cells * 100
+    if missing.any():
+        values[missing] = np.broadcast_to(acc.column_means(), values.shape)[missing]
 
-    quality_score = max(0, 100 - missing_pct - outlier_pct)
+    filled_df = pd.DataFrame(values, columns=sensors, index=numeric_df.index)
 
     return {
         "filled_df": filled_df,
+        "sensor_std": acc.column_std(),
+        **acc.result()
+    }
+
+
+def compute_data_quality_stacked(values):
+
+    # values: (assets, rows, sensors), every asset scored in one set of
+    # array ops; same metrics as compute_data_quality, per asset
+    values = np.array(values, dtype=np.float64)
+
+    n_assets, rows, n_sensors = values.shape
+
+    if n_sensors < 2:
+        raise ValueError("Need at least 2 sensor columns.")
+
+    missing = np.isnan(values)
+
+    count = (~missing).sum(axis=1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(missing, 0.0, values).sum(axis=1) / count
+
+    values[missing] = np.broadcast_to(mean[:, None, :], values.shape)[missing]
+
+    # std of the mean-filled column, as DataQualityAccumulator.column_std
+    if rows >= 2:
+        dev = values - mean[:, None, :]
+        std = np.sqrt(np.einsum("aij,aij->aj", dev, dev) / (rows - 1))
+    else:
+        dev = None
+        std = np.full((n_assets, n_sensors), np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+
+        safe = np.where(std == 0, 1.0, std)
+
+        if dev is None:
+            outliers = np.zeros(n_assets)
+        else:
+            outliers = np.count_nonzero(
+                (np.abs(dev) / safe[:, None, :] > 3) & ~missing, axis=(1, 2)
+            )
+
+        valid = ~np.isnan(std)
+        noise = np.where(
+            valid.any(axis=1),
+            np.where(valid, std, 0.0).sum(axis=1) / valid.sum(axis=1),
+            np.nan
+        )
+
+    total_cells = rows * n_sensors
+
+    if total_cells > 0:
+        missing_pct = (total_cells - count.sum(axis=1)) / total_cells * 100
+        outlier_pct = outliers / total_cells * 100
+    else:
+        missing_pct = np.zeros(n_assets)
+        outlier_pct = np.zeros(n_assets)
+
+    return {
+        "filled": values,
+        "sensor_std": std,
         "missing_pct": missing_pct,
         "noise": noise,
         "outlier_pct": outlier_pct,
-        "quality_score": quality_score
-    }
\ No newline at end of file
+        "quality_score": np.maximum(0, 100 - missing_pct - outlier_pct)
+    }
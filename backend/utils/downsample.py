@@ -0,0 +1,57 @@
+import numpy as np
+
+
+def lttb_indices(y, max_points):
+
+    # Largest-Triangle-Three-Buckets, vectorized over all buckets at once.
+    # The triangle for each bucket is anchored on the previous bucket's mean
+    # rather than the previously selected point, which removes the
+    # sequential dependency and lets every bucket be scored in one pass.
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+
+    n = len(y)
+
+    if max_points is None or max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    # interior points 1 .. n-2 split into max_points - 2 buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    starts = edges[:-1]
+    counts = np.diff(edges)
+
+    x_mean = starts + (counts - 1) / 2
+    y_mean = np.add.reduceat(y[:n - 1], starts) / counts
+
+    prev_x = np.concatenate([[0.0], x_mean[:-1]])
+    prev_y = np.concatenate([[y[0]], y_mean[:-1]])
+    next_x = np.concatenate([x_mean[1:], [n - 1.0]])
+    next_y = np.concatenate([y_mean[1:], [y[-1]]])
+
+    bucket = np.repeat(np.arange(len(starts)), counts)
+
+    x = np.arange(1, n - 1, dtype=np.float64)
+
+    ax = prev_x[bucket]
+    ay = prev_y[bucket]
+
+    area = np.abs(
+        (ax - next_x[bucket]) * (y[1:n - 1] - ay)
+        - (ax - x) * (next_y[bucket] - ay)
+    )
+
+    best = np.maximum.reduceat(area, starts - 1)
+
+    hits = np.flatnonzero(area == best[bucket])
+    _, first = np.unique(bucket[hits], return_index=True)
+
+    return np.concatenate([[0], hits[first] + 1, [n - 1]])
+
+
+def downsample_indices(y, max_points, preserve=None):
+
+    index = lttb_indices(y, max_points)
+
+    if preserve is not None and len(preserve) > 0:
+        index = np.union1d(index, np.asarray(preserve, dtype=np.int64))
+
+    return index
@@ -1,12 +1,131 @@
 import numpy as np
 
-def fuse_sensors(df, sensors):
+# Every kernel takes a C-contiguous float64 matrix of shape (..., rows,
+# sensors) plus the per-sensor std (..., sensors) and returns the fused
+# (..., rows) signal in float64. Leading dimensions are independent assets.
+# Everything stays in float64: sensors reading ~1e5 with small noise lose
+# most of their signal to float32 rounding.
+
+
+def _std(matrix, std):
+
+    if std is None:
+        std = matrix.std(axis=-2, dtype=np.float64)
+
+    return np.asarray(std, dtype=np.float64)
+
+
+def _centered(matrix, std):
+
+    # (matrix - mean) plus the per-sensor 1 / std scale
+    std = _std(matrix, std)
+
+    mean = matrix.mean(axis=-2, keepdims=True)
+
+    scale = 1 / np.where(std > 0, std, 1.0)
+
+    return matrix - mean, scale
+
+
+def fuse_mean(matrix, std=None):
+
+    # the original behaviour: raw units, every sensor weighted equally
+    return matrix.mean(axis=-1)
+
+
+def fuse_normalized(matrix, std=None):
+
+    # z-score every sensor first, so no sensor dominates through its units;
+    # the mean of z-scores is one matrix-vector product
+    centered, scale = _centered(matrix, std)
+
+    return np.matmul(centered, scale[..., None])[..., 0] / matrix.shape[-1]
+
+
+def fuse_inverse_variance(matrix, std=None):
+
+    # noisier sensors count for less; constant sensors carry no signal and
+    # get no weight
+    var = _std(matrix, std) ** 2
+
+    weights = np.where(var > 0, 1 / np.where(var > 0, var, 1.0), 0.0)
+
+    total = weights.sum(axis=-1, keepdims=True)
+
+    weights = np.where(total > 0, weights / np.where(total > 0, total, 1.0), 1 / var.shape[-1])
+
+    return np.matmul(matrix, weights[..., None])[..., 0]
+
+
+def fuse_median(matrix, std=None):
+
+    # robust to a single failing sensor
+    return np.median(matrix, axis=-1)
+
+
+def fuse_pca(matrix, std=None):
+
+    # projection onto the first principal component of the standardized
+    # sensors; the sign is chosen so the fused signal rises with the sensors
+    centered, scale = _centered(matrix, std)
+
+    z = centered * scale[..., None, :]
+
+    gram = np.matmul(np.swapaxes(z, -1, -2), z)
+
+    _, vectors = np.linalg.eigh(gram)
+
+    component = vectors[..., :, -1]
+
+    sign = np.where(component.sum(axis=-1, keepdims=True) < 0, -1.0, 1.0)
+
+    component = component * sign
+
+    return np.matmul(z, component[..., None])[..., 0]
+
+
+FUSION_STRATEGIES = {
+    "mean": fuse_mean,
+    "normalized": fuse_normalized,
+    "inverse_variance": fuse_inverse_variance,
+    "median": fuse_median,
+    "pca": fuse_pca,
+}
+
+
+def fuse_matrix(matrix, strategy="mean", std=None):
+
+    if strategy not in FUSION_STRATEGIES:
+        raise ValueError(f"Unknown fusion strategy: {strategy}")
+
+    if matrix.shape[-1] == 0:
+        raise ValueError("No sensors provided for fusion")
+
+    matrix = np.ascontiguousarray(matrix, dtype=np.float64)
+
+    return FUSION_STRATEGIES[strategy](matrix, std)
+
+
+def fuse_sensors(df, sensors, strategy="mean", std=None):
 
     if len(sensors) == 0:
         raise ValueError("No sensors provided for fusion")
 
-    sensor_data = df[sensors]
+    matrix = np.ascontiguousarray(df[sensors].to_numpy(dtype=np.float64))
+
+    if std is not None:
+
+        # sensors with no readings at all have no std and are left out
+        std = np.asarray(std, dtype=np.float64)
+        keep = ~np.isnan(std)
+
+        if not keep.all():
+            matrix, std = np.ascontiguousarray(matrix[:, keep]), std[keep]
+
+    return fuse_matrix(matrix, strategy, std)
+
 
-    fused_signal = sensor_data.mean(axis=1)
+def fuse_stacked(values, strategy="mean", std=None):
 
-    return fused_signal.values
\ No newline at end of file
+    # (assets, rows, sensors) -> (assets, rows)
+    return fuse_matrix(values, strategy, std)
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 100_000
+PREVIEW_ROWS = 1_000
+
+# bytes per read when counting lines to size the column buffer
+COUNT_BLOCK = 1 << 20
+
+
+def _rewind(file):
+
+    if hasattr(file, "seek"):
+        file.seek(0)
+
+
+def _count_lines(file):
+
+    # an upper bound on the data rows (quoted newlines only overcount);
+    # a raw byte scan is far cheaper than the CSV parse it sizes
+    if not hasattr(file, "seek"):
+        return None
+
+    _rewind(file)
+
+    lines = 1
+
+    while True:
+
+        block = file.read(COUNT_BLOCK)
+
+        if not block:
+            break
+
+        lines += block.count("\n" if isinstance(block, str) else b"\n")
+
+    _rewind(file)
+
+    return lines
+
+
+def _normalize(columns):
+
+    return [str(c).strip().lower() for c in columns]
+
+
+def inspect_csv(file, nrows=PREVIEW_ROWS):
+
+    # parse only the first rows to learn the header and column dtypes
+    _rewind(file)
+
+    head = pd.read_csv(file, nrows=nrows)
+
+    _rewind(file)
+
+    raw_names = {}
+
+    for raw, name in zip(head.columns, _normalize(head.columns)):
+        if not name.startswith("unnamed") and name not in raw_names:
+            raw_names[name] = raw
+
+    head = head[list(raw_names.values())]
+    head.columns = list(raw_names.keys())
+
+    return head, raw_names
+
+
+def iter_sensor_chunks(file, raw_names, sensors, chunksize=CHUNK_ROWS):
+
+    # only the selected columns are tokenized into floats, everything else
+    # in the file is skipped by the parser
+    _rewind(file)
+
+    usecols = [raw_names[s] for s in sensors]
+    rename = {raw_names[s]: s for s in sensors}
+
+    reader = pd.read_csv(file, usecols=usecols, chunksize=chunksize)
+
+    for chunk in reader:
+
+        chunk = chunk.rename(columns=rename)[sensors]
+
+        values = chunk.apply(pd.to_numeric, errors="coerce")
+
+        yield values.to_numpy(dtype=np.float64)
+
+
+def read_sensor_columns(file, raw_names, sensors, chunksize=CHUNK_ROWS):
+
+    # chunks are copied into one buffer sized from the line count (grown
+    # geometrically in place if that is unknown), so a large upload is
+    # never held twice as a list of blocks plus their concatenation
+    capacity = _count_lines(file) or chunksize
+
+    values = np.empty((capacity, len(sensors)), dtype=np.float64)
+    rows = 0
+
+    for block in iter_sensor_chunks(file, raw_names, sensors, chunksize):
+
+        if rows + len(block) > len(values):
+            values.resize((max(2 * len(values), rows + len(block)), len(sensors)), refcheck=False)
+
+        block[~np.isfinite(block)] = np.nan
+
+        values[rows:rows + len(block)] = block
+        rows += len(block)
+
+    values.resize((rows, len(sensors)), refcheck=False)
+
+    return pd.DataFrame(values, columns=sensors)
@@ -0,0 +1,124 @@
+import math
+import threading
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+def _format_labels(labels):
+
+    if not labels:
+        return ""
+
+    pairs = ",".join(f'{k}="{v}"' for k, v in labels)
+
+    return "{" + pairs + "}"
+
+
+def _format_value(value):
+
+    if value == math.inf:
+        return "+Inf"
+
+    return repr(float(value))
+
+
+class Histogram:
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+        # labels tuple -> [bucket counts..., sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+
+        key = tuple(sorted(labels.items()))
+
+        with self._lock:
+
+            series = self._series.get(key)
+
+            if series is None:
+                series = [0] * len(self.buckets) + [0.0, 0]
+                self._series[key] = series
+
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram"
+        ]
+
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+
+        for key, series in sorted(snapshot.items()):
+
+            cumulative = 0
+
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(key + (("le", _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+
+        return "\n".join(lines)
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+
+        self._histograms = {}
+        self._collectors = []
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+
+        if name not in self._histograms:
+            self._histograms[name] = Histogram(name, help_text, buckets)
+
+        return self._histograms[name]
+
+    def add_collector(self, collect):
+
+        # collect() returns [(name, type, help, value), ...] at scrape time
+        self._collectors.append(collect)
+
+    def render(self):
+
+        blocks = [h.render() for h in self._histograms.values()]
+
+        for collect in self._collectors:
+            for name, kind, help_text, value in collect():
+                blocks.append(
+                    f"# HELP {name} {help_text}\n"
+                    f"# TYPE {name} {kind}\n"
+                    f"{name} {_format_value(value)}"
+                )
+
+        return "\n".join(blocks) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.histogram(
+    "pipeline_stage_seconds",
+    "Time spent in each model pipeline stage."
+)
@@ -0,0 +1,143 @@
+import numpy as np
+from scipy.stats import chi2, norm
+
+CHUNK_ROWS = 65_536
+TOP_SENSORS = 3
+
+# one-sided normal quantile for the anomaly cut-off (p ~ 0.999)
+ANOMALY_Z = 3.09
+
+# ridge added to the correlation matrix so duplicated or constant sensors
+# do not make it singular
+RIDGE = 1e-6
+
+
+class MultivariateBaseline:
+
+    # per-sensor mean/std plus the inverse correlation matrix of the
+    # standardized residuals, over the usable columns (keep) of the
+    # n_sensors it was fitted on; fitted once per model and reused
+
+    def __init__(self, n_sensors, keep, mean, std, precision):
+
+        self.n_sensors = n_sensors
+        self.keep = keep
+        self.mean = mean
+        self.std = std
+        self.precision = precision
+
+
+def sensor_residuals(values, fused, predicted):
+
+    # (rows, sensors) residual of every sensor against the model: a
+    # sensor's expected value is its least-squares fit on the fused signal,
+    # evaluated at the model's prediction, so a fault in one sensor stays
+    # in that sensor's column instead of being averaged away
+    values = np.asarray(values, dtype=np.float64)
+    fused = np.asarray(fused, dtype=np.float64)
+    predicted = np.asarray(predicted, dtype=np.float64)
+
+    # rows the model does not predict are scored against the actual signal
+    predicted = np.where(np.isfinite(predicted), predicted, fused)
+
+    centered = fused - fused.mean()
+    var = centered @ centered
+
+    mean = values.mean(axis=0)
+    slope = centered @ values / var if var > 0 else np.zeros(values.shape[1])
+
+    expected = predicted - fused.mean()
+
+    residuals = np.empty_like(values)
+
+    for start in range(0, len(values), CHUNK_ROWS):
+        rows = slice(start, start + CHUNK_ROWS)
+        residuals[rows] = values[rows] - mean - np.outer(expected[rows], slope)
+
+    return residuals
+
+
+def fit_multivariate_baseline(values):
+
+    values = np.asarray(values, dtype=np.float64)
+
+    mean = values.mean(axis=0)
+    std = values.std(axis=0)
+
+    # sensors with no readings or no variation carry no information and
+    # would turn every distance into NaN; they are left out of the baseline
+    keep = np.flatnonzero(np.isfinite(std) & (std > 0))
+
+    if len(keep) == 0:
+        raise ValueError("No sensor has usable residuals for multivariate scoring")
+
+    mean, std = mean[keep], std[keep]
+
+    # covariance accumulated over row chunks: X^T X of the standardized rows
+    gram = np.zeros((len(keep), len(keep)))
+
+    for start in range(0, len(values), CHUNK_ROWS):
+        z = (values[start:start + CHUNK_ROWS, keep] - mean) / std
+        gram += z.T @ z
+
+    corr = gram / max(len(values) - 1, 1)
+    corr[np.diag_indices(len(keep))] += RIDGE
+
+    precision = np.linalg.pinv(corr, hermitian=True)
+
+    return MultivariateBaseline(values.shape[1], keep, mean, std, precision)
+
+
+def chi2_threshold(dof, z=ANOMALY_Z):
+
+    # chi-square quantile at the same tail probability as the z cut-off
+    return chi2.ppf(norm.cdf(z), dof)
+
+
+def score_multivariate(baseline, values, sensors, top=TOP_SENSORS):
+
+    # squared Mahalanobis distance per row, computed in row chunks so the
+    # (rows, sensors) temporaries stay bounded. Each anomaly reports the
+    # sensors with the largest share of its distance; shares sum to d^2.
+    # Only the baseline's columns are scored; a missing reading counts as
+    # sitting at the baseline mean.
+    values = np.asarray(values, dtype=np.float64)
+
+    keep = baseline.keep
+
+    distance = np.empty(len(values))
+
+    for start in range(0, len(values), CHUNK_ROWS):
+        z = np.nan_to_num((values[start:start + CHUNK_ROWS, keep] - baseline.mean) / baseline.std)
+        distance[start:start + len(z)] = np.einsum("ij,ij->i", z @ baseline.precision, z)
+
+    np.maximum(distance, 0, out=distance)
+
+    anomalies = np.flatnonzero(distance > chi2_threshold(len(baseline.keep)))
+
+    # only anomalous rows need the per-sensor breakdown
+    z = np.nan_to_num((values[np.ix_(anomalies, keep)] - baseline.mean) / baseline.std)
+    contribution = (z @ baseline.precision) * z
+
+    top = min(top, contribution.shape[1])
+
+    order = np.argpartition(-contribution, top - 1, axis=1)[:, :top]
+    order = np.take_along_axis(
+        order, np.argsort(-np.take_along_axis(contribution, order, axis=1), axis=1), axis=1
+    )
+
+    names = np.asarray(sensors)[keep]
+
+    drivers = [
+        [
+            {"sensor": str(names[j]), "z": float(z[row, j]), "share": float(contribution[row, j] / distance[i])}
+            for j in order[row]
+        ]
+        for row, i in enumerate(anomalies)
+    ]
+
+    distance = np.sqrt(distance)
+
+    health = 100 - (distance / (np.max(distance, initial=0) + 1e-6) * 100)
+
+    return anomalies, drivers, distance, health
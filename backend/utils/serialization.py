@@ -0,0 +1,90 @@
+import json
+import struct
+
+import numpy as np
+
+# Layout (all little-endian):
+#   b"DTWB" | uint32 header length | JSON header | pad to 8 bytes
+#   followed by each array's raw buffer, every buffer padded to 8 bytes.
+# The header lists {"name", "dtype", "length", "offset"} per array, with
+# offsets relative to the first array byte, plus a "meta" object.
+
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+MAGIC = b"DTWB"
+ALIGN = 8
+
+
+def wants_binary(accept):
+
+    return BINARY_MEDIA_TYPE in (accept or "")
+
+
+def _padding(size):
+
+    return b"\0" * (-size % ALIGN)
+
+
+def encode_arrays(arrays, meta):
+
+    # returns the payload as a list of chunks, so the array buffers can be
+    # handed to the server as memoryviews without a copy
+    buffers = []
+    fields = []
+    offset = 0
+
+    for name, values in arrays.items():
+
+        values = np.ascontiguousarray(values)
+
+        if values.dtype.byteorder == ">":
+            values = values.astype(values.dtype.newbyteorder("<"))
+
+        fields.append({
+            "name": name,
+            "dtype": values.dtype.str,
+            "length": int(values.size),
+            "offset": offset
+        })
+
+        buffers.append(memoryview(values).cast("B"))
+        offset += values.nbytes + (-values.nbytes % ALIGN)
+
+    header = json.dumps({"arrays": fields, "meta": meta}).encode()
+    prefix = MAGIC + struct.pack("<I", len(header)) + header
+
+    chunks = [prefix + _padding(len(prefix))]
+
+    for buf in buffers:
+        chunks.append(buf)
+        if len(buf) % ALIGN:
+            chunks.append(_padding(len(buf)))
+
+    return chunks
+
+
+def decode_arrays(payload):
+
+    payload = memoryview(payload)
+
+    if bytes(payload[:4]) != MAGIC:
+        raise ValueError("Not a binary model response.")
+
+    (header_len,) = struct.unpack("<I", payload[4:8])
+
+    header = json.loads(bytes(payload[8:8 + header_len]))
+
+    start = 8 + header_len
+    start += -start % ALIGN
+
+    arrays = {
+        field["name"]: np.frombuffer(
+            payload,
+            dtype=np.dtype(field["dtype"]),
+            count=field["length"],
+            offset=start + field["offset"]
+        )
+        for field in header["arrays"]
+    }
+
+    return arrays, header["meta"]
@@ -134,7 +134,7 @@ function Dashboard() {
 
       setChartData(
         data.actual.map((value, index) => ({
-          index,
+          index:     data.index ? data.index[index] : index,
           actual:    value,
           predicted: data.predicted[index],
           anomaly:   data.anomalies[index] ? value : null,
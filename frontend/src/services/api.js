@@ -42,13 +42,14 @@ export const previewCSV = (file) => {
 // UPLOAD CSV + SELECTED SENSORS
 // ─────────────────────────────────────
 
-export const uploadCSV = (file, sensors, model) => {
+export const uploadCSV = (file, sensors, model, maxPoints = 5000) => {
 
   const formData = new FormData();
 
   formData.append("file", file);
   formData.append("sensors", sensors); // comma separated
   formData.append("model", model);
+  formData.append("max_points", maxPoints); // server-side LTTB downsampling
 
   return API.post("/upload-csv", formData, {
     headers: { "Content-Type": "multipart/form-data" }
@@ -5,14 +5,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
 
 from ui.sidebar import render_sidebar
 from ui.plots import plot_system
 from ui.reports import render_report_download
 from utils.data_quality import compute_data_quality
-from utils.fusion import fuse_sensors
-from utils.anomaly import compute_anomalies_and_health
+from pipeline import Pipeline
+
+pipeline = Pipeline()
+
+MAX_PLOT_POINTS = 5000
 
 
 def render_dashboard():
@@ -81,28 +83,11 @@ def render_dashboard():
         st.session_state.model_results = None
 
     if st.button("▶ Run Model", type="primary", use_container_width=True):
-        fused = fuse_sensors(dq["filled_df"], sensors)
-        scaler = MinMaxScaler()
-
         with st.spinner(f"Running {model_type}..."):
-            if model_type == "Linear Regression":
-                from models.linear_model import run_linear_regression
-                actual = fused
-                predicted = run_linear_regression(fused)
-            elif model_type == "Random Forest":
-                from models.random_forest import run_random_forest
-                actual = fused
-                predicted = run_random_forest(fused)
-            elif model_type == "LSTM":
-                from models.lstm_model import run_lstm
-                actual, predicted = run_lstm(fused, scaler)
-            else:
-                from models.autoencoder import run_autoencoder
-                actual, predicted = run_autoencoder(fused, scaler)
-
-        anomalies, error, health = compute_anomalies_and_health(actual, predicted)
-        health_val = float(np.mean(health))
-        anomaly_count = len(anomalies)
+            result = pipeline.run(numeric_df, sensors, model_type, horizon, dq=dq)
+
+        health_val = result["health"]
+        anomaly_count = len(result["anomalies"])
 
         if health_val < health_threshold or anomaly_count > anomaly_limit:
             status = "Critical"
@@ -112,14 +97,13 @@ def render_dashboard():
             status = "Healthy"
 
         st.session_state.model_results = {
-            "actual": actual,
-            "predicted": predicted,
-            "anomalies": anomalies,
-            "error": error,
+            "actual": result["actual"],
+            "predicted": result["predicted"],
+            "anomalies": result["anomalies"],
             "health": health_val,
             "anomaly_count": anomaly_count,
             "status": status,
-            "future": np.full(horizon, predicted[-1]),
+            "future": result["future"],
             "noise": dq["noise"],
         }
 
@@ -135,7 +119,10 @@ def render_dashboard():
             with cols[1]: st.metric("Status", r["status"])
             with cols[2]: st.metric("Detected Anomalies", r["anomaly_count"])
 
-            fig = plot_system(r["actual"], r["predicted"], r["anomalies"], r["future"])
+            fig = plot_system(
+                r["actual"], r["predicted"], r["anomalies"], r["future"],
+                max_points=MAX_PLOT_POINTS
+            )
             st.pyplot(fig, use_container_width=True)
             st.markdown("</div>", unsafe_allow_html=True)
 
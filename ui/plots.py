@@ -1,11 +1,19 @@
 import matplotlib.pyplot as plt
 import numpy as np
 
-def plot_system(actual, predicted, anomalies, future):
+from utils.downsample import downsample_indices
+
+def plot_system(actual, predicted, anomalies, future, max_points=None):
     fig, ax = plt.subplots(figsize=(8, 3), dpi=72)  # smaller size and DPI
 
-    ax.plot(actual, label="Actual")
-    ax.plot(predicted, "--", label="Predicted")
+    actual = np.asarray(actual)
+    predicted = np.asarray(predicted)
+
+    # LTTB-downsample long signals, always keeping the anomaly points
+    index = downsample_indices(actual, max_points, anomalies)
+
+    ax.plot(index, actual[index], label="Actual")
+    ax.plot(index, predicted[index], "--", label="Predicted")
 
     if future is not None and len(future) > 0:
         ax.plot(
@@ -16,7 +24,7 @@ def plot_system(actual, predicted, anomalies, future):
     if len(anomalies) > 0:
         ax.scatter(
             anomalies,
-            np.array(actual)[anomalies],
+            actual[anomalies],
             color="red", label="Anomaly", zorder=5
         )
 
@@ -25,4 +33,4 @@ def plot_system(actual, predicted, anomalies, future):
     plt.tight_layout()
     plt.close('all')  # free memory after render
 
-    return fig
\ No newline at end of file
+    return fig